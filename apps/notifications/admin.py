@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Notification
+from .models import Notification, NotificationArchive, Subscription
 
 
 @admin.register(Notification)
@@ -8,3 +8,17 @@ class NotificationAdmin(admin.ModelAdmin):
     list_display = ('id', 'notification_type', 'is_read', 'created_at')
     list_filter = ('notification_type', 'is_read', 'related_object_id', 'created_at')
     search_fields = ('message',)
+
+
+@admin.register(Subscription)
+class SubscriptionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'target_type', 'target', 'created_at')
+    list_filter = ('target_type', 'created_at')
+    search_fields = ('target', 'user__username')
+
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ('id', 'notification_type', 'is_read', 'created_at', 'archived_at')
+    list_filter = ('notification_type', 'is_read', 'archived_at')
+    search_fields = ('message',)
@@ -0,0 +1,109 @@
+import logging
+from functools import partial
+
+from django.db import transaction
+from redis import RedisError
+
+from config.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+UNREAD_KEY = "notifications:unread:{user_id}"
+# Bumped by every write, so a rebuild can tell whether a write raced with its count.
+UNREAD_VERSION_KEY = "notifications:unread:{user_id}:version"
+UNREAD_TTL = 60 * 60 * 24
+
+# KEYS are (counter, version) pairs. Only counters that are already cached are moved, a missing one is rebuilt
+# from the database on the next read.
+_ADD_TO_EXISTING = redis_client.register_script("""
+local delta = tonumber(ARGV[1])
+for i = 1, #KEYS, 2 do
+    redis.call('INCR', KEYS[i + 1])
+    redis.call('EXPIRE', KEYS[i + 1], ARGV[2])
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        if redis.call('INCRBY', KEYS[i], delta) < 0 then
+            redis.call('DEL', KEYS[i])
+        end
+    end
+end
+return #KEYS / 2
+""")
+
+_RESET = redis_client.register_script("""
+for i = 1, #KEYS, 2 do
+    redis.call('DEL', KEYS[i])
+    redis.call('INCR', KEYS[i + 1])
+    redis.call('EXPIRE', KEYS[i + 1], ARGV[1])
+end
+return #KEYS / 2
+""")
+
+# Saves a rebuilt counter only if no write bumped the version since the count started.
+_SET_IF_UNCHANGED = redis_client.register_script("""
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3], 'NX')
+return 1
+""")
+
+
+def _keys(user_ids):
+    keys = []
+    for user_id in user_ids:
+        keys += [UNREAD_KEY.format(user_id=user_id), UNREAD_VERSION_KEY.format(user_id=user_id)]
+    return keys
+
+
+def add_unread(user_ids, delta=1):
+    """
+    Moves the cached unread counters once the transaction commits, so a rebuild never counts a write twice.
+    """
+    keys = _keys(user_ids)
+    if keys:
+        transaction.on_commit(partial(_add_unread, keys, delta))
+
+
+def _add_unread(keys, delta):
+    try:
+        _ADD_TO_EXISTING(keys=keys, args=[delta, UNREAD_TTL])
+    except RedisError as e:
+        logger.warning(f"Unread counters could not be updated: {e}")
+
+
+def reset_unread(*user_ids):
+    keys = _keys(user_ids)
+    if keys:
+        transaction.on_commit(partial(_reset_unread, keys))
+
+
+def _reset_unread(keys):
+    try:
+        _RESET(keys=keys, args=[UNREAD_TTL])
+    except RedisError as e:
+        logger.warning(f"Unread counters could not be reset: {e}")
+
+
+def unread_count(user_id):
+    """
+    Returns the cached unread counter, counting the unread notifications on the (user, is_read) index when it is missing.
+    The count is cached only if no notification of the user was written while it ran.
+    """
+    from .models import Notification
+
+    key, version_key = UNREAD_KEY.format(user_id=user_id), UNREAD_VERSION_KEY.format(user_id=user_id)
+    try:
+        count, version = redis_client.mget(key, version_key)
+    except RedisError as e:
+        logger.warning(f"Unread counter could not be read: {e}")
+        return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+    if count is not None:
+        return int(count)
+
+    count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+    try:
+        _SET_IF_UNCHANGED(keys=[key, version_key], args=[version or "", count, UNREAD_TTL])
+    except RedisError as e:
+        logger.warning(f"Unread counter could not be saved: {e}")
+    return count
@@ -0,0 +1,50 @@
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.db import models, transaction
+
+
+class NotificationManager(models.Manager):
+    def bulk_notify(self, user_ids, message, notification_type, related_object_id, batch_size=None):
+        """
+        Creates the same notification for every user id with one INSERT per batch and returns the number created.
+        """
+        from . import push
+        from .inbox import add_unread
+
+        batch_size = batch_size or settings.NOTIFICATION_BULK_BATCH_SIZE
+        user_ids = iter(user_ids)
+        created = 0
+        while batch := list(islice(user_ids, batch_size)):
+            notifications = self.bulk_create([
+                self.model(user_id=user_id, message=message, notification_type=notification_type, related_object_id=related_object_id)
+                for user_id in batch
+            ])
+            add_unread(batch)
+            transaction.on_commit(partial(push.publish, notifications))
+            created += len(batch)
+        return created
+
+    def notify(self, user_id, message, notification_type, related_object_id):
+        from . import push
+        from .inbox import add_unread
+
+        notification = self.create(user_id=user_id, message=message, notification_type=notification_type, related_object_id=related_object_id)
+        add_unread([user_id])
+        transaction.on_commit(partial(push.publish, [notification]))
+        return notification
+
+
+class SubscriptionQuerySet(models.QuerySet):
+    def audience(self, company_id, skill_ids, location):
+        """
+        Returns the distinct ids of users following the company, any of the skills or the location.
+        Every branch is a lookup on the (target_type, target, user) unique index.
+        """
+        TargetType = self.model.TargetType
+        return self.filter(
+            models.Q(target_type=TargetType.COMPANY, target=str(company_id))
+            | models.Q(target_type=TargetType.SKILL, target__in=[str(skill_id) for skill_id in skill_ids])
+            | models.Q(target_type=TargetType.LOCATION, target=self.model.location_key(location))
+        ).order_by().values_list("user_id", flat=True).distinct()
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+BATCH_SIZE = 5000
+
+
+def subscribe_applicants(apps, schema_editor):
+    JobApplication = apps.get_model("posts", "JobApplication")
+    Subscription = apps.get_model("notifications", "Subscription")
+
+    pairs = JobApplication.objects.order_by() \
+        .values_list("job_seeker__user_id", "job_posting__company_id") \
+        .distinct() \
+        .iterator(chunk_size=BATCH_SIZE)
+
+    batch = []
+    for user_id, company_id in pairs:
+        batch.append(Subscription(user_id=user_id, target_type="Company", target=str(company_id)))
+        if len(batch) >= BATCH_SIZE:
+            Subscription.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    Subscription.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_subscription'),
+        ('posts', '0007_stats_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(subscribe_applicants, migrations.RunPython.noop),
+    ]
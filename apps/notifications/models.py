@@ -1,6 +1,8 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from .managers import NotificationManager, SubscriptionQuerySet
+
 
 class Notification(models.Model):
     class NotificationType(models.TextChoices):
@@ -20,7 +22,54 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = NotificationManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at", "id"], name="notification_user_created_idx"),
+            models.Index(fields=["user", "is_read", "created_at"], name="notification_user_unread_idx"),
+            models.Index(fields=["notification_type", "created_at"], name="notification_type_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s message"
 
+
+class NotificationArchive(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="archived_notifications")
+    message = models.TextField()
+    notification_type = models.CharField(max_length=50, choices=Notification.NotificationType.choices)
+    related_object_id = models.IntegerField()
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.username}'s archived message"
+
+
+class Subscription(models.Model):
+    class TargetType(models.TextChoices):
+        COMPANY = "Company", _("Company")
+        SKILL = "Skill", _("Skill")
+        LOCATION = "Location", _("Location")
+
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="subscriptions")
+    target_type = models.CharField(max_length=20, choices=TargetType.choices)
+    target = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = SubscriptionQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["target_type", "target", "user"], name="subscription_target_user_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} -> {self.target_type}: {self.target}"
+
+    @staticmethod
+    def location_key(location):
+        return location.strip().lower()
@@ -1,6 +1,13 @@
 from rest_framework.pagination import PageNumberPagination
 
+from apps.users.paginations import KeysetCursorPagination
+
 
 class NotificationPageNumberPagination(PageNumberPagination):
     page_size = 10
     max_page_size = 100
+
+
+class NotificationCursorPagination(KeysetCursorPagination):
+    page_size = 10
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+import redis.asyncio
+from django.conf import settings
+from django.utils.module_loading import import_string
+from redis import RedisError
+
+from config.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "notifications:user:{user_id}"
+
+
+def notification_payload(notification):
+    return {
+        "id": notification.id,
+        "message": notification.message,
+        "notification_type": notification.notification_type,
+        "related_object_id": notification.related_object_id,
+        "is_read": notification.is_read,
+        "created_at": notification.created_at.isoformat(),
+    }
+
+
+class RedisChannelLayer:
+    """
+    Publishes notifications to a Redis pub/sub channel per user, so any ASGI worker can stream them.
+    """
+
+    def publish(self, messages):
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            for user_id, payload in messages:
+                pipeline.publish(CHANNEL.format(user_id=user_id), json.dumps(payload))
+            pipeline.execute()
+        except RedisError as e:
+            logger.warning(f"Notifications could not be published: {e}")
+
+    async def subscribe(self, user_id, timeout):
+        """
+        Yields None once the channel is subscribed, then every payload, and None after `timeout` seconds without one.
+        """
+        client = redis.asyncio.Redis(
+            host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB, decode_responses=True
+        )
+        pubsub = client.pubsub()
+        await pubsub.subscribe(CHANNEL.format(user_id=user_id))
+        try:
+            yield None
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+                yield json.loads(message["data"]) if message else None
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+
+class InMemoryChannelLayer:
+    """
+    Delivers notifications to subscribers of the same process, for tests and single-process development.
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+
+    def publish(self, messages):
+        for user_id, payload in messages:
+            for loop, queue in list(self.subscribers[user_id]):
+                loop.call_soon_threadsafe(queue.put_nowait, payload)
+
+    async def subscribe(self, user_id, timeout):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        self.subscribers[user_id].add(subscriber)
+        try:
+            yield None
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), timeout)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self.subscribers[user_id].discard(subscriber)
+
+
+_layers = {}
+
+
+def get_channel_layer():
+    path = settings.NOTIFICATION_CHANNEL_LAYER
+    if path not in _layers:
+        _layers[path] = import_string(path)()
+    return _layers[path]
+
+
+def publish(notifications):
+    get_channel_layer().publish([(notification.user_id, notification_payload(notification)) for notification in notifications])
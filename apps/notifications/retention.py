@@ -0,0 +1,79 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .inbox import reset_unread
+from .models import Notification, NotificationArchive
+
+logger = logging.getLogger(__name__)
+
+
+def purge_batch(notification_type, cutoff, batch_size, archive):
+    """
+    Deletes, or moves to the archive, up to `batch_size` of the oldest notifications of the type created before the cutoff.
+    Every batch is its own short transaction, so rows are never locked for longer than one batch. Full rows are
+    loaded only to archive them, a plain delete selects just the columns it needs.
+    """
+    queryset = Notification.objects.filter(notification_type=notification_type, created_at__lt=cutoff) \
+        .order_by("created_at", "id")
+    if archive:
+        notifications = list(queryset[:batch_size])
+        rows = [(notification.id, notification.user_id, notification.is_read) for notification in notifications]
+    else:
+        rows = list(queryset.values_list("id", "user_id", "is_read")[:batch_size])
+    if not rows:
+        return 0
+
+    with transaction.atomic():
+        if archive:
+            NotificationArchive.objects.bulk_create([
+                NotificationArchive(
+                    id=notification.id,
+                    user_id=notification.user_id,
+                    message=notification.message,
+                    notification_type=notification.notification_type,
+                    related_object_id=notification.related_object_id,
+                    is_read=notification.is_read,
+                    created_at=notification.created_at,
+                ) for notification in notifications
+            ], ignore_conflicts=True)
+        Notification.objects.filter(id__in=[id for id, _, _ in rows]).delete()
+
+    reset_unread(*{user_id for _, user_id, is_read in rows if not is_read})
+    return len(rows)
+
+
+def purge_expired(now=None):
+    """
+    Purges the notifications older than the retention period of their type and returns the rows purged per type.
+    A type without a retention period is kept forever. A run stops after NOTIFICATION_PURGE_MAX_BATCHES batches
+    and leaves the rest to the next one.
+    """
+    now = now or timezone.now()
+    batch_size = settings.NOTIFICATION_PURGE_BATCH_SIZE
+    batches_left = settings.NOTIFICATION_PURGE_MAX_BATCHES
+    archive = settings.NOTIFICATION_ARCHIVE
+    started = time.perf_counter()
+
+    purged = {}
+    for notification_type, days in settings.NOTIFICATION_RETENTION_DAYS.items():
+        if days is None:
+            continue
+        cutoff = now - timedelta(days=days)
+        purged[notification_type] = 0
+        while batches_left > 0:
+            batches_left -= 1
+            count = purge_batch(notification_type, cutoff, batch_size, archive)
+            purged[notification_type] += count
+            if count < batch_size:
+                break
+
+    logger.info(
+        f"Notification retention: {sum(purged.values())} rows {'archived' if archive else 'deleted'} "
+        f"in {time.perf_counter() - started:.2f}s {purged}."
+    )
+    return purged
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
-from .models import Notification
+from .inbox import add_unread, reset_unread
+from .models import Notification, Subscription
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -12,8 +13,12 @@ class NotificationSerializer(serializers.ModelSerializer):
 
 
     def get_user(self, obj):
+        # A page of notifications usually belongs to one user, so each user is serialized once per page.
         from apps.users.serializers import UserSerializer
-        return UserSerializer(obj.user).data
+        users = self.context.setdefault("users", {})
+        if obj.user_id not in users:
+            users[obj.user_id] = UserSerializer(obj.user).data
+        return users[obj.user_id]
 
 
 class NotificationIsReadSerializer(serializers.Serializer):
@@ -28,11 +33,15 @@ class NotificationIsReadSerializer(serializers.Serializer):
         except Notification.DoesNotExist:
             raise serializers.ValidationError({"error": "Bu ID bo'yicha bildirishnoma yo'q."})
 
-        if notification.user != self.context['request'].user:
+        user = self.context['request'].user
+        if notification.user_id != user.id:
             raise serializers.ValidationError({"error": "Bu bildirishnomaga huquqingiz yo'q"})
 
+        # Only the request that actually flips is_read moves the counter, concurrent ones update nothing.
+        if Notification.objects.filter(id=id, user=user, is_read=False).update(is_read=True):
+            add_unread([user.id], -1)
         notification.is_read = True
-        notification.save()
+        notification.user = user
 
         attrs.pop("id")
         attrs['notification'] = NotificationSerializer(notification).data
@@ -41,6 +50,7 @@ class NotificationIsReadSerializer(serializers.Serializer):
 
 class NotificationsIsReadSerializer(serializers.Serializer):
     user = serializers.IntegerField()
+    up_to_id = serializers.IntegerField(required=False, allow_null=True, min_value=1)
 
     def validate(self, attrs):
         user_id = attrs['user']
@@ -49,15 +59,44 @@ class NotificationsIsReadSerializer(serializers.Serializer):
         if user_id != request_user.id:
             raise serializers.ValidationError({"error": "Bu bildirishnomaga huquqingiz yo'q"})
 
-        notifications = Notification.objects.filter(user=user_id)
+        notifications = Notification.objects.filter(user=user_id, is_read=False)
+        if attrs.get('up_to_id'):
+            notifications = notifications.filter(id__lte=attrs['up_to_id'])
 
-        if not notifications.exists():
-            raise serializers.ValidationError({"error": "Foydalanuvchi uchun bildirishnomalar topilmadi"})
+        attrs['count'] = notifications.update(is_read=True)
+        reset_unread(user_id)
+        return attrs
+
+
+class SubscriptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Subscription
+        fields = ('id', 'target_type', 'target', 'created_at')
+
+
+    def validate(self, attrs):
+        from apps.skills.models import Skill
+        from apps.users.models import Company
+
+        user = self.context['request'].user
+        target_type = attrs['target_type']
+        target = attrs['target'].strip()
+
+        if user.profile_id is None:
+            raise serializers.ValidationError({"error": "Obuna bo'lish uchun avval profil yarating."})
+
+        if target_type == Subscription.TargetType.LOCATION:
+            target = Subscription.location_key(target)
+        else:
+            model = Company if target_type == Subscription.TargetType.COMPANY else Skill
+            if not target.isdigit() or not model.objects.filter(id=target).exists():
+                raise serializers.ValidationError({"error": "Bu ID bo'yicha obuna obyekti topilmadi."})
 
-        notifications.update(is_read=True)
+        if Subscription.objects.filter(user=user, target_type=target_type, target=target).exists():
+            raise serializers.ValidationError({"error": "Siz bunga allaqachon obuna bo'lgansiz."})
 
-        attrs['notifications'] = notifications
+        attrs['target'] = target
         return attrs
 
-    def to_representation(self, instance):
-        return NotificationSerializer(instance['notifications'], many=True).data
+    def create(self, validated_data):
+        return Subscription.objects.create(user=self.context['request'].user, **validated_data)
@@ -0,0 +1,21 @@
+from __future__ import absolute_import, unicode_literals
+
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def send_notifications(user_ids, message, notification_type, related_object_id):
+    from .models import Notification
+    sent = Notification.objects.bulk_notify(user_ids, message, notification_type, related_object_id)
+    logger.info(f"{sent} '{notification_type}' notifications sent for object {related_object_id}.")
+    return sent
+
+
+@shared_task
+def purge_expired_notifications():
+    from .retention import purge_expired
+    return purge_expired()
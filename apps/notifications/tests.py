@@ -1,5 +1,18 @@
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.test import override_settings
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.notifications import inbox, push, retention
+from apps.notifications.models import Notification, NotificationArchive, Subscription
+from apps.skills.models import Skill
+from apps.users.models import JobSeeker, User
 
 
 class MyNotificationsListGetTestCase(APITestCase):
@@ -44,3 +57,242 @@ class NotificationsPutTestCase(APITestCase):
     def test_list_get(self):
         response = self.client.get(self.url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class SubscriptionTestCase(APITestCase):
+    def setUp(self):
+        self.url = "/api/notifications/subscriptions/"
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="seeker", email="seeker@gmail.com", password="132546587")
+        JobSeeker.objects.create(
+            user=self.user,
+            first_name="Test",
+            last_name="Test",
+            date_of_birth="2000-01-01",
+            phone_number="+998901234567",
+            location="test",
+            bio="test",
+            experience_years=1,
+            education_level="Bachelors"
+        )
+        self.skill = Skill.objects.create(name="Python", category=Skill.SkillCategoryChoice.PROGRAMMING)
+        self.client.force_authenticate(user=self.user)
+
+    def test_subscribe_and_unsubscribe(self):
+        response = self.client.post(self.url, {"target_type": Subscription.TargetType.SKILL, "target": str(self.skill.id)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['message'], "Obuna muvaffaqiyatli yaratildi.")
+        response = self.client.post(self.url, {"target_type": Subscription.TargetType.LOCATION, "target": " Tashkent "}, format='json')
+        self.assertEqual(response.data['data']['target'], "tashkent")
+
+        response = self.client.post(self.url, {"target_type": Subscription.TargetType.SKILL, "target": str(self.skill.id)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, {"target_type": Subscription.TargetType.COMPANY, "target": "999"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, format='json')
+        self.assertEqual(response.data['message'], "Obunalar muvaffaqiyatli olindi.")
+        subscriptions = response.data['data']['results']
+        self.assertEqual([subscription['target'] for subscription in subscriptions], ["tashkent", str(self.skill.id)])
+
+        response = self.client.delete(f"{self.url}{subscriptions[0]['id']}/", format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['message'], "Obuna muvaffaqiyatli bekor qilindi.")
+        self.assertEqual(list(Subscription.objects.values_list("target", flat=True)), [str(self.skill.id)])
+
+
+class InboxTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="seeker", email="seeker@gmail.com", password="132546587")
+        self.client.force_authenticate(user=self.user)
+        self.key = inbox.UNREAD_KEY.format(user_id=self.user.id)
+        version_key = inbox.UNREAD_VERSION_KEY.format(user_id=self.user.id)
+        inbox.redis_client.delete(self.key, version_key)
+        self.addCleanup(inbox.redis_client.delete, self.key, version_key)
+        for i in range(3):
+            Notification.objects.notify(self.user.id, f"test {i}", Notification.NotificationType.SYSTEM, i)
+
+    def unread_count(self):
+        response = self.client.get("/api/notifications/unread-count/", format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['message'], "O'qilmagan bildirishnomalar soni olindi.")
+        return response.data['data']['unread_count']
+
+    def test_unread_counter(self):
+        self.assertEqual(self.unread_count(), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.unread_count(), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.bulk_notify([self.user.id], "test", Notification.NotificationType.SYSTEM, 4)
+        self.assertEqual(self.unread_count(), 4)
+
+        notification = Notification.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(f"/api/notifications/{notification.id}/read/", format='json')
+            self.client.get(f"/api/notifications/{notification.id}/read/", format='json')
+        self.assertEqual(self.unread_count(), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get("/api/notifications/read-all/", format='json')
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_filtered_empty_list_is_not_a_404(self):
+        Notification.objects.update(is_read=True)
+        response = self.client.get("/api/notifications/my-notification/", {"is_read": "false"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['results'], [])
+
+        Notification.objects.all().delete()
+        response = self.client.get("/api/notifications/my-notification/", format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_rebuild_racing_a_write_is_not_cached(self):
+        count = QuerySet.count
+
+        def count_then_notify(queryset):
+            result = count(queryset)
+            with self.captureOnCommitCallbacks(execute=True):
+                Notification.objects.notify(self.user.id, "late", Notification.NotificationType.SYSTEM, 9)
+            return result
+
+        with mock.patch.object(QuerySet, "count", count_then_notify):
+            self.assertEqual(inbox.unread_count(self.user.id), 3)
+        self.assertIsNone(inbox.redis_client.get(self.key))
+        self.assertEqual(inbox.unread_count(self.user.id), 4)
+
+    def test_user_is_serialized_once_per_page(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/notifications/my-notification/", format='json')
+        results = response.data['data']['results']
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(notification['user']['id'] == self.user.id for notification in results))
+
+
+@override_settings(NOTIFICATION_CHANNEL_LAYER="apps.notifications.push.InMemoryChannelLayer", NOTIFICATION_STREAM_HEARTBEAT=0.05)
+class NotificationStreamTestCase(APITestCase):
+    def setUp(self):
+        self.url = "/api/notifications/stream/"
+        self.user = User.objects.create_user(username="seeker", email="seeker@gmail.com", password="132546587", is_active=True)
+        self.token = str(AccessToken.for_user(self.user))
+        self.addCleanup(inbox.redis_client.delete, inbox.UNREAD_KEY.format(user_id=self.user.id))
+
+    def notify(self, message):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.objects.notify(self.user.id, message, Notification.NotificationType.SYSTEM, 1)
+
+    async def next_event(self, stream):
+        while (chunk := await stream.__anext__()) == b": ping\n\n":
+            pass
+        return chunk.decode()
+
+    async def test_notifications_are_pushed(self):
+        response = await self.async_client.get(self.url, {"token": self.token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = response.streaming_content.__aiter__()
+        self.assertEqual(await stream.__anext__(), b": connected\n\n")
+
+        await stream.__anext__()
+        self.assertTrue(push.get_channel_layer().subscribers[self.user.id])
+        notification = await sync_to_async(self.notify)("Yangi xabar")
+
+        event = await self.next_event(stream)
+        self.assertTrue(event.startswith(f"id: {notification.id}\nevent: notification\n"))
+        self.assertIn("Yangi xabar", event)
+        await stream.aclose()
+
+    async def test_missed_notifications_are_replayed(self):
+        first = await sync_to_async(self.notify)("first")
+        await sync_to_async(self.notify)("second")
+        response = await self.async_client.get(self.url, {"token": self.token}, headers={"Last-Event-ID": str(first.id)})
+        stream = response.streaming_content.__aiter__()
+        await stream.__anext__()
+        event = await self.next_event(stream)
+        self.assertIn("second", event)
+        await stream.aclose()
+
+    @override_settings(NOTIFICATION_STREAM_REPLAY_BATCH_SIZE=2)
+    async def test_replay_is_paged(self):
+        first = await sync_to_async(self.notify)("first")
+        for i in range(5):
+            await sync_to_async(self.notify)(f"missed {i}")
+        response = await self.async_client.get(self.url, {"token": self.token}, headers={"Last-Event-ID": str(first.id)})
+        stream = response.streaming_content.__aiter__()
+        await stream.__anext__()
+        for i in range(5):
+            self.assertIn(f"missed {i}", await self.next_event(stream))
+        await stream.aclose()
+
+    @override_settings(NOTIFICATION_STREAM_REPLAY_BATCH_SIZE=1)
+    async def test_notification_created_during_replay_is_sent_once(self):
+        first = await sync_to_async(self.notify)("first")
+        await sync_to_async(self.notify)("second")
+        response = await self.async_client.get(self.url, {"token": self.token}, headers={"Last-Event-ID": str(first.id)})
+        stream = response.streaming_content.__aiter__()
+        await stream.__anext__()
+        self.assertIn("second", await self.next_event(stream))
+
+        third = await sync_to_async(self.notify)("third")
+        self.assertTrue((await self.next_event(stream)).startswith(f"id: {third.id}\n"))
+        self.assertEqual(await stream.__anext__(), b": ping\n\n")
+        await stream.aclose()
+
+    async def test_token_is_required(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = await self.async_client.get(self.url, {"token": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class MarkAllReadTestCase(APITestCase):
+    def setUp(self):
+        self.url = "/api/notifications/read-all/"
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="seeker", email="seeker@gmail.com", password="132546587")
+        self.client.force_authenticate(user=self.user)
+        self.addCleanup(inbox.redis_client.delete, inbox.UNREAD_KEY.format(user_id=self.user.id))
+        Notification.objects.bulk_notify([self.user.id] * 5, "test", Notification.NotificationType.SYSTEM, 1)
+        self.ids = list(Notification.objects.order_by("id").values_list("id", flat=True))
+        Notification.objects.filter(id=self.ids[0]).update(is_read=True)
+
+    def test_mark_all_read_up_to_watermark(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"up_to_id": self.ids[3]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['count'], 3)
+        self.assertEqual(list(Notification.objects.filter(is_read=False).values_list("id", flat=True)), [self.ids[4]])
+
+        response = self.client.get(self.url, format='json')
+        self.assertEqual(response.data['data']['count'], 1)
+        self.assertEqual(inbox.unread_count(self.user.id), 0)
+
+
+@override_settings(
+    NOTIFICATION_RETENTION_DAYS={"Job Posting": 30, "System": None},
+    NOTIFICATION_PURGE_BATCH_SIZE=2,
+)
+class RetentionTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="seeker", email="seeker@gmail.com", password="132546587")
+        self.addCleanup(inbox.redis_client.delete, inbox.UNREAD_KEY.format(user_id=self.user.id))
+        Notification.objects.bulk_notify([self.user.id] * 5, "old", Notification.NotificationType.JOB_POSTING, 1)
+        Notification.objects.bulk_notify([self.user.id] * 2, "old", Notification.NotificationType.SYSTEM, 1)
+        Notification.objects.update(created_at=timezone.now() - timedelta(days=31))
+        Notification.objects.bulk_notify([self.user.id], "new", Notification.NotificationType.JOB_POSTING, 1)
+
+    def test_expired_notifications_are_purged_in_batches(self):
+        self.assertEqual(inbox.unread_count(self.user.id), 8)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(retention.purge_expired(), {"Job Posting": 5})
+        self.assertEqual(Notification.objects.filter(notification_type=Notification.NotificationType.JOB_POSTING).get().message, "new")
+        self.assertEqual(Notification.objects.filter(notification_type=Notification.NotificationType.SYSTEM).count(), 2)
+        self.assertEqual(inbox.unread_count(self.user.id), 3)
+        self.assertFalse(NotificationArchive.objects.exists())
+
+    @override_settings(NOTIFICATION_ARCHIVE=True, NOTIFICATION_PURGE_MAX_BATCHES=2)
+    def test_expired_notifications_are_archived(self):
+        self.assertEqual(retention.purge_expired(), {"Job Posting": 4})
+        self.assertEqual(retention.purge_expired(), {"Job Posting": 1})
+        self.assertEqual(NotificationArchive.objects.filter(message="old").count(), 5)
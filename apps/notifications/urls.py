@@ -24,5 +24,9 @@ urlpatterns = [
     path("notifications/<int:pk>/", views.NotificationListAPIView.as_view(), name="my_notification"),
     path("notifications/<int:pk>/read/", views.NotificationUpdateAPIView.as_view(), name="notification_status_update"),
     path("notifications/read-all/", views.NotificationsUpdateAPIView.as_view(), name="notifications_status_update"),
+    path("notifications/stream/", views.notification_stream, name="notifications_stream"),
+    path("notifications/unread-count/", views.UnreadNotificationsCountAPIView.as_view(), name="notifications_unread_count"),
+    path("notifications/subscriptions/", views.SubscriptionListCreateAPIView.as_view(), name="subscriptions"),
+    path("notifications/subscriptions/<int:pk>/", views.SubscriptionDestroyAPIView.as_view(), name="subscription_delete"),
     path('swagger/', schema_view.as_view(), name='swagger-docs')
 ]
@@ -1,24 +1,33 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.filters import OrderingFilter
-from rest_framework.generics import ListAPIView
+from rest_framework.generics import DestroyAPIView, ListAPIView, ListCreateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.users.authentication import CachedJWTAuthentication
 from apps.users.custom_response_decorator import custom_response
+from apps.users.paginations import CursorPaginationMixin
 from apps.users.versioning import CustomHeaderVersioning
 
-from . import models, paginations, serializers
+from . import inbox, models, paginations, push, serializers
 
 
 @custom_response("notifications_list")
-class MyNotificationListAPIView(ListAPIView):
-    queryset = models.Notification.objects.all()
+class MyNotificationListAPIView(CursorPaginationMixin, ListAPIView):
+    queryset = models.Notification.objects.select_related("user")
     serializer_class = serializers.NotificationSerializer
     permission_classes = [IsAuthenticated]
     versioning_class = CustomHeaderVersioning
     pagination_class = paginations.NotificationPageNumberPagination
+    cursor_pagination_class = paginations.NotificationCursorPagination
     filter_backends = [OrderingFilter, DjangoFilterBackend]
     ordering = ['created_at']
     filterset_fields = ['notification_type', 'is_read']
@@ -32,17 +41,18 @@ class MyNotificationListAPIView(ListAPIView):
     def list(self, request, *args, **kwargs):
         version = self.request.version
         if version == '1.0':
-            queryset = self.get_queryset()
-            if not queryset.exists():
+            response = super().list(request, *args, **kwargs)
+            # An empty first page may come from the filters, the user's unfiltered notifications decide the 404.
+            if not response.data['results'] and not response.data.get('previous') and not self.get_queryset().exists():
                 return Response({
                     "message": "Hali bildirishnoma yo'q."
                 }, status=status.HTTP_404_NOT_FOUND)
-            return super().list(request, *args, **kwargs)
+            return response
 
 
 @custom_response("notifications_list")
 class NotificationListAPIView(ListAPIView):
-    queryset = models.Notification.objects.all()
+    queryset = models.Notification.objects.select_related("user")
     serializer_class = serializers.NotificationSerializer
     permission_classes = [IsAuthenticated]
     versioning_class = CustomHeaderVersioning
@@ -60,12 +70,13 @@ class NotificationListAPIView(ListAPIView):
     def list(self, request, *args, **kwargs):
         version = self.request.version
         if version == '1.0':
-            queryset = self.get_queryset()
-            if not queryset.exists():
+            response = super().list(request, *args, **kwargs)
+            # An empty first page may come from the filters, the user's unfiltered notifications decide the 404.
+            if not response.data['results'] and not response.data.get('previous') and not self.get_queryset().exists():
                 return Response({
                     "message": "Hali bildirishnoma yo'q."
                 }, status=status.HTTP_404_NOT_FOUND)
-            return super().list(request, *args, **kwargs)
+            return response
 
 
 @custom_response("notification_status_read")
@@ -81,26 +92,148 @@ class NotificationUpdateAPIView(APIView):
 
 
 @custom_response("notifications_status_read")
-class NotificationsUpdateAPIView(ListAPIView):
-    queryset = models.Notification.objects.all()
-    serializer_class = serializers.NotificationsIsReadSerializer
+class NotificationsUpdateAPIView(APIView):
+    permission_classes = [IsAuthenticated]
     versioning_class = CustomHeaderVersioning
 
     def get(self, request, *args, **kwargs):
         version = request.version
         if version == '1.0':
-            notifications = models.Notification.objects.filter(user=request.user)
-            if not notifications.exists():
-                return Response({
-                    "message": "Bildirishnomalar hali yo'q."
-                }, status=status.HTTP_404_NOT_FOUND)
-
             serializer = serializers.NotificationsIsReadSerializer(
-                data={"user": request.user.id},
+                data={"user": request.user.id, "up_to_id": request.query_params.get("up_to_id")},
                 context={"request": request}
             )
             serializer.is_valid(raise_exception=True)
 
             return Response({
-                "count": notifications.count()
+                "count": serializer.validated_data['count']
             })
+
+
+@custom_response("subscriptions")
+class SubscriptionListCreateAPIView(ListCreateAPIView):
+    queryset = models.Subscription.objects.all()
+    serializer_class = serializers.SubscriptionSerializer
+    permission_classes = [IsAuthenticated]
+    versioning_class = CustomHeaderVersioning
+    pagination_class = paginations.NotificationPageNumberPagination
+
+
+    def get_queryset(self):
+        version = self.request.version
+        if version == '1.0':
+            return self.queryset.filter(user=self.request.user).order_by('-created_at', '-id')
+
+    def get(self, request, *args, **kwargs):
+        version = self.request.version
+        if version == '1.0':
+            return self.list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        version = self.request.version
+        if version == '1.0':
+            serializer = self.serializer_class(data=request.data, context={"request": request})
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            return Response(serializer.data)
+
+
+@custom_response("subscription_delete")
+class SubscriptionDestroyAPIView(DestroyAPIView):
+    queryset = models.Subscription.objects.all()
+    serializer_class = serializers.SubscriptionSerializer
+    permission_classes = [IsAuthenticated]
+    versioning_class = CustomHeaderVersioning
+
+
+    def get_queryset(self):
+        version = self.request.version
+        if version == '1.0':
+            return self.queryset.filter(user=self.request.user)
+
+    def delete(self, request, *args, **kwargs):
+        version = self.request.version
+        if version == '1.0':
+            instance = self.get_object()
+            instance.delete()
+            return Response()
+
+
+@custom_response("notifications_unread_count")
+class UnreadNotificationsCountAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    versioning_class = CustomHeaderVersioning
+
+    def get(self, request, *args, **kwargs):
+        version = self.request.version
+        if version == '1.0':
+            return Response({"unread_count": inbox.unread_count(request.user.id)})
+
+
+async def notification_stream(request):
+    """
+    Streams the user's new notifications as Server-Sent Events. Browsers can't set headers on an EventSource,
+    so the access token may also be passed as `?token=`. A `Last-Event-ID` header replays what was missed.
+    """
+    try:
+        user = await sync_to_async(authenticate_stream)(request)
+    except AuthenticationFailed as e:
+        return JsonResponse({"status": False, "message": "Token yaroqsiz.", "errors": {"detail": str(e)}, "data": {}}, status=401)
+    if user is None:
+        return JsonResponse({"status": False, "message": "Token kiritilmagan.", "errors": {}, "data": {}}, status=401)
+
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    last_id = int(last_event_id) if last_event_id.isdigit() else None
+
+    async def events():
+        yield ": connected\n\n"
+        # Subscribing before the replay means a notification created in between is either replayed or pushed.
+        subscription = push.get_channel_layer().subscribe(user.id, settings.NOTIFICATION_STREAM_HEARTBEAT)
+        try:
+            await subscription.__anext__()
+            replayed_id = last_id
+            if last_id is not None:
+                async for payload in replay(user, last_id):
+                    replayed_id = payload["id"]
+                    yield stream_event(payload)
+            async for payload in subscription:
+                if payload is None:
+                    yield ": ping\n\n"
+                elif replayed_id is None or payload["id"] > replayed_id:
+                    yield stream_event(payload)
+        finally:
+            await subscription.aclose()
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def replay(user, last_id):
+    """
+    Yields the user's notifications after `last_id`, in pages of NOTIFICATION_STREAM_REPLAY_BATCH_SIZE.
+    """
+    batch_size = settings.NOTIFICATION_STREAM_REPLAY_BATCH_SIZE
+    while True:
+        notifications = await sync_to_async(list)(
+            models.Notification.objects.filter(user=user, id__gt=last_id).order_by("id")[:batch_size]
+        )
+        for notification in notifications:
+            yield push.notification_payload(notification)
+        if len(notifications) < batch_size:
+            return
+        last_id = notifications[-1].id
+
+
+def authenticate_stream(request):
+    authentication = CachedJWTAuthentication()
+    raw_token = request.GET.get("token")
+    if raw_token:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    result = authentication.authenticate(request)
+    return result[0] if result else None
+
+
+def stream_event(payload):
+    return f"id: {payload['id']}\nevent: notification\ndata: {json.dumps(payload)}\n\n"
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import JobApplication, JobPosting, SavedJob
+from .models import JobApplication, JobPosting, SavedJob, StatsSnapshot
 
 
 @admin.register(JobPosting)
@@ -20,3 +20,9 @@ class JobApplicationAdmin(admin.ModelAdmin):
 class SavedJobAdmin(admin.ModelAdmin):
     list_display = ('id', 'saved_date')
     list_filter = ('saved_date',)
+
+
+@admin.register(StatsSnapshot)
+class StatsSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'computed_at')
+    readonly_fields = ('name', 'data', 'computed_at')
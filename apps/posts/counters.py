@@ -0,0 +1,91 @@
+import uuid
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from config.redis import redis_client
+
+VIEWS_KEY = "posts:views"
+FLUSHING_VIEWS_KEY = "posts:views:flushing"
+FLUSH_LOCK_KEY = "posts:views:flush-lock"
+FLUSH_LOCK_TIMEOUT = 5 * 60 * 1000
+FLUSH_ID_FIELD = "flush_id"
+FLUSH_BATCH_SIZE = 500
+
+_CLAIM_VIEWS = redis_client.register_script("""
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return {}
+    end
+    redis.call('RENAME', KEYS[1], KEYS[2])
+end
+redis.call('HSETNX', KEYS[2], ARGV[1], ARGV[2])
+return redis.call('HGETALL', KEYS[2])
+""")
+
+_RELEASE_LOCK = redis_client.register_script("""
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+""")
+
+
+def increment_views(post_id):
+    """
+    Buffers one view of a posting and returns the number of views not flushed to the DB yet.
+    """
+    return redis_client.hincrby(VIEWS_KEY, post_id, 1)
+
+
+def claim_views():
+    """
+    Returns the buffer being flushed, with its flush id, taking the current buffer when no flush is pending.
+    """
+    values = _CLAIM_VIEWS(keys=[VIEWS_KEY, FLUSHING_VIEWS_KEY], args=[FLUSH_ID_FIELD, uuid.uuid4().hex])
+    return dict(zip(values[::2], values[1::2]))
+
+
+def flush_views():
+    """
+    Moves the buffered view counts into JobPosting.views_count.
+    A Lua script renames the buffer and tags it with a flush id in one step, so views counted during the flush land
+    in a fresh hash. A buffer left over from a failed flush is retried before a new one is taken. The flush id is
+    saved with the counts, so a buffer whose flush committed but was not deleted is not added twice.
+    """
+    token = uuid.uuid4().hex
+    if not redis_client.set(FLUSH_LOCK_KEY, token, nx=True, px=FLUSH_LOCK_TIMEOUT):
+        return 0
+    try:
+        return apply_views(claim_views())
+    finally:
+        _RELEASE_LOCK(keys=[FLUSH_LOCK_KEY], args=[token])
+
+
+def apply_views(buffer):
+    from .models import JobPosting, ViewsFlush
+
+    flush_id = buffer.pop(FLUSH_ID_FIELD, None)
+    if flush_id is None:
+        return 0
+    counts = [(int(post_id), int(count)) for post_id, count in buffer.items()]
+
+    with transaction.atomic():
+        flush = ViewsFlush.objects.select_for_update().filter(id=1).first() or ViewsFlush.objects.create(id=1)
+        if flush.flush_id != flush_id:
+            for start in range(0, len(counts), FLUSH_BATCH_SIZE):
+                batch = counts[start:start + FLUSH_BATCH_SIZE]
+                JobPosting.objects.filter(id__in=[post_id for post_id, _ in batch]).update(
+                    views_count=F("views_count") + Case(
+                        *[When(id=post_id, then=Value(count)) for post_id, count in batch],
+                        default=Value(0),
+                        output_field=IntegerField()
+                    )
+                )
+            flush.flush_id = flush_id
+            flush.flushed_at = timezone.now()
+            flush.save()
+        transaction.on_commit(lambda: redis_client.delete(FLUSHING_VIEWS_KEY))
+
+    return len(counts)
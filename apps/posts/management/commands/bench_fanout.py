@@ -0,0 +1,99 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.utils import timezone
+
+from apps.notifications.models import Notification, Subscription
+from apps.posts import tasks
+from apps.posts.models import JobApplication, JobPosting
+from apps.users.models import Company, JobSeeker, User
+
+
+class Command(BaseCommand):
+    help = "Seeds applicants subscribed to one company, measures the new posting notification fan-out and deletes the seeded rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, default=100_000)
+        parser.add_argument("--batch-size", type=int, default=1000, help="Notifications per INSERT.")
+        parser.add_argument("--seed-batch-size", type=int, default=10_000)
+        parser.add_argument("--legacy", action="store_true", help="Also time the old per-row implementation.")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded rows.")
+
+    def handle(self, *args, **options):
+        post = self.seed(options["recipients"], options["seed_batch_size"])
+
+        try:
+            if options["legacy"]:
+                started = time.perf_counter()
+                self.legacy(post)
+                self.stdout.write(f"legacy fan-out: {time.perf_counter() - started:.2f}s")
+                Notification.objects.filter(related_object_id=post.id).delete()
+
+            with override_settings(
+                NOTIFICATION_BULK_BATCH_SIZE=options["batch_size"],
+                NOTIFICATION_FANOUT_CHUNK_SIZE=options["recipients"]
+            ):
+                started = time.perf_counter()
+                result = tasks.new_posting_notification(post.id, post.title, post.company_id)
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"bulk fan-out: {elapsed:.2f}s for {result['recipients']} recipients "
+                f"({result['recipients'] / elapsed:.0f} notifications/s)"
+            )
+        finally:
+            if not options["keep"]:
+                User.objects.filter(username__startswith="bench_fanout").delete()
+
+    def legacy(self, post):
+        users_to_notify = set()
+        for company_post in JobPosting.objects.filter(company_id=post.company_id):
+            for application in JobApplication.objects.filter(job_posting=company_post):
+                users_to_notify.add(application.job_seeker.user)
+        for user in users_to_notify:
+            Notification.objects.create(
+                user=user,
+                message=f"Yangi vakansiya: {post.title}",
+                notification_type=Notification.NotificationType.JOB_POSTING,
+                related_object_id=post.id
+            )
+
+    def seed(self, count, batch_size):
+        started = time.perf_counter()
+        company_user = User.objects.create(username="bench_fanout_company", email="bench_fanout_company@example.com")
+        company = Company.objects.create(
+            user=company_user, name="Bench", description="bench", website="https://bench-fanout.example.com",
+            industry="IT", location="Tashkent", founded_year=2020, employees_count=1
+        )
+        post = JobPosting.objects.create(
+            company=company, title="bench", description="bench", requirements="bench", responsibilities="bench",
+            location="Tashkent", job_type=JobPosting.JobTypeChoice.FULL_TIME,
+            experience_level=JobPosting.ExperienceLevelChoice.MIDDLE,
+            education_required=JobPosting.EducationRequiredChoice.BACHELORS,
+            salary_min=100, salary_max=200, deadline=timezone.now().date()
+        )
+
+        for offset in range(0, count, batch_size):
+            size = min(batch_size, count - offset)
+            users = User.objects.bulk_create([
+                User(username=f"bench_fanout_{offset + i}", email=f"bench_fanout_{offset + i}@example.com", password="!")
+                for i in range(size)
+            ])
+            job_seekers = JobSeeker.objects.bulk_create([
+                JobSeeker(
+                    user=user, first_name="Bench", last_name="Bench", date_of_birth="2000-01-01",
+                    phone_number="+998901234567", location="Tashkent", bio="bench", experience_years=1,
+                    education_level="Bachelors"
+                ) for user in users
+            ])
+            JobApplication.objects.bulk_create([
+                JobApplication(job_posting=post, job_seeker=job_seeker, cover_later="bench", resume="bench.pdf")
+                for job_seeker in job_seekers
+            ])
+            Subscription.objects.bulk_create([
+                Subscription(user=user, target_type=Subscription.TargetType.COMPANY, target=str(company.id))
+                for user in users
+            ])
+
+        self.stdout.write(f"Seeded {count} applicants in {time.perf_counter() - started:.1f}s.")
+        return post
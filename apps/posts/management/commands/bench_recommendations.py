@@ -0,0 +1,141 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Case, Q, When
+from django.utils import timezone
+
+from apps.posts import recently_viewed, recommendations
+from apps.posts.models import JobPosting
+from apps.skills.models import Skill
+from apps.users.models import Company, JobSeeker, User
+
+LOCATIONS = ["Tashkent", "Samarkand", "Bukhara", "Namangan", "Andijan", "Fergana", "Khiva", "Nukus"]
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return (
+        f"p50={statistics.median(timings):.2f}ms "
+        f"p95={timings[max(int(len(timings) * 0.95) - 1, 0)]:.2f}ms max={timings[-1]:.2f}ms"
+    )
+
+
+class Command(BaseCommand):
+    help = "Seeds job postings, compares the old recommendation query with the scoring recommender and deletes the seeded rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--postings", type=int, default=100_000)
+        parser.add_argument("--skills", type=int, default=200)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded postings.")
+
+    def handle(self, *args, **options):
+        user, skills = self.seed(options["postings"], options["skills"], options["batch_size"])
+        page_size = options["page_size"]
+
+        try:
+            viewed_ids = recently_viewed.get(user.id)
+
+            def legacy():
+                viewed_jobs = JobPosting.objects.filter(id__in=viewed_ids)
+                viewed_job_skills, locations, experiences, educations = set(), set(), set(), set()
+                for job in viewed_jobs:
+                    viewed_job_skills.update(job.skills_required.all())
+                    locations.add(job.location)
+                    experiences.add(job.experience_level)
+                    educations.add(job.education_required)
+                posts = JobPosting.objects.with_related().filter(
+                    Q(skills_required__in=viewed_job_skills) |
+                    Q(location__in=locations) |
+                    Q(experience_level__in=experiences) |
+                    Q(education_required__in=educations)
+                ).distinct().order_by("is_active")
+                posts.count()
+                list(posts[:page_size])
+
+            def scored():
+                ids = recommendations.get_recommended_ids(user)
+                posts = JobPosting.objects.with_related().filter(id__in=ids) \
+                    .order_by(Case(*[When(id=post_id, then=position) for position, post_id in enumerate(ids)]))
+                posts.count()
+                list(posts[:page_size])
+
+            def cold():
+                recommendations.invalidate_user(user.id)
+                scored()
+
+            self.stdout.write(f"legacy query:        {timed(legacy, options['repeat'])}")
+            self.stdout.write(f"scored, cache miss:  {timed(cold, options['repeat'])}")
+            self.stdout.write(f"scored, cache hit:   {timed(scored, options['repeat'])}")
+        finally:
+            if not options["keep"]:
+                self.cleanup(user, skills)
+
+    def cleanup(self, user, skills):
+        recommendations.invalidate_user(user.id)
+        recently_viewed.redis_client.delete(recently_viewed.RECENTLY_VIEWED_KEY.format(user_id=user.id))
+        User.objects.filter(username__startswith="bench_recommendations").delete()
+        Skill.objects.filter(id__in=[skill.id for skill in skills]).delete()
+
+    def seed(self, count, skills_count, batch_size):
+        started = time.perf_counter()
+        skills = Skill.objects.bulk_create([
+            Skill(name=f"bench_recommendations_{i}", category=Skill.SkillCategoryChoice.HARD_SKILL)
+            for i in range(skills_count)
+        ])
+        company_user = User.objects.create(username="bench_recommendations_company", email="bench_recommendations_company@example.com")
+        company = Company.objects.create(
+            user=company_user, name="Bench", description="bench", website="https://bench-recommendations.example.com",
+            industry="IT", location="Tashkent", founded_year=2020, employees_count=1
+        )
+        deadline = timezone.now().date()
+        PostingSkill = JobPosting.skills_required.through
+
+        for offset in range(0, count, batch_size):
+            posts = JobPosting.objects.bulk_create([
+                JobPosting(
+                    company=company,
+                    title="bench",
+                    description="bench",
+                    requirements="bench",
+                    responsibilities="bench",
+                    location=random.choice(LOCATIONS),
+                    job_type=random.choice(JobPosting.JobTypeChoice.values),
+                    experience_level=random.choice(JobPosting.ExperienceLevelChoice.values),
+                    education_required=random.choice(JobPosting.EducationRequiredChoice.values),
+                    salary_min=100,
+                    salary_max=200,
+                    deadline=deadline,
+                    is_active=True,
+                ) for _ in range(min(batch_size, count - offset))
+            ])
+            PostingSkill.objects.bulk_create([
+                PostingSkill(jobposting_id=post.id, skill_id=skill.id)
+                for post in posts
+                for skill in random.sample(skills, 3)
+            ])
+
+        seeker_user = User.objects.create(username="bench_recommendations_seeker", email="bench_recommendations_seeker@example.com")
+        job_seeker = JobSeeker.objects.create(
+            user=seeker_user, first_name="Bench", last_name="Bench", date_of_birth="2000-01-01",
+            phone_number="+998901234567", location="Tashkent", bio="bench", experience_years=1, education_level="Bachelors"
+        )
+        job_seeker.skills.set(random.sample(skills, 5))
+        for post_id in JobPosting.objects.filter(company=company).order_by("?").values_list("id", flat=True)[:5]:
+            recently_viewed.add(seeker_user.id, post_id)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {JobPosting._meta.db_table}")
+            cursor.execute(f"ANALYZE {PostingSkill._meta.db_table}")
+        self.stdout.write(f"Seeded {count} postings in {time.perf_counter() - started:.1f}s.")
+        return seeker_user, skills
@@ -0,0 +1,88 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from apps.posts import search
+from apps.posts.models import JobPosting
+from apps.users.models import Company, User
+
+WORDS = [
+    "python", "django", "backend", "frontend", "developer", "engineer", "designer", "manager",
+    "analyst", "senior", "junior", "remote", "accountant", "marketing", "sales", "support",
+    "data", "cloud", "devops", "mobile", "android", "ios", "react", "golang", "java", "teacher",
+]
+
+
+def random_text(count):
+    # A few real job words mixed with a large random vocabulary, so terms have realistic selectivity.
+    return " ".join(
+        random.choice(WORDS) if random.random() < 0.1 else f"w{random.randint(0, 50_000)}"
+        for _ in range(count)
+    )
+
+
+class Command(BaseCommand):
+    help = "Seeds job postings, measures search latency and deletes the seeded rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--postings", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument("--query", action="append", dest="queries")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded postings.")
+
+    def handle(self, *args, **options):
+        queries = options["queries"] or ["python developer", "senior devops", "acountant", "nonexistentword"]
+        company = self.seed(options["postings"], options["batch_size"])
+
+        try:
+            for query in queries:
+                timings = []
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    list(search.search_job_postings(query)[:options["limit"]])
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f"{query!r}: p50={statistics.median(timings):.2f}ms "
+                    f"p95={timings[max(int(len(timings) * 0.95) - 1, 0)]:.2f}ms max={timings[-1]:.2f}ms"
+                )
+        finally:
+            if not options["keep"]:
+                company.user.delete()
+
+    def seed(self, count, batch_size):
+        user, _ = User.objects.get_or_create(username="bench_search", defaults={"email": "bench_search@example.com"})
+        company, _ = Company.objects.get_or_create(user=user, defaults={
+            "name": "Bench", "description": "bench", "website": "https://bench-search.example.com",
+            "industry": "IT", "location": "Tashkent", "founded_year": 2020, "employees_count": 1
+        })
+        deadline = timezone.now().date()
+        started = time.perf_counter()
+        for offset in range(0, count, batch_size):
+            JobPosting.objects.bulk_create([
+                JobPosting(
+                    company=company,
+                    title=f"{random.choice(WORDS)} {random.choice(WORDS)} {random_text(2)}",
+                    description=random_text(40),
+                    requirements=random_text(15),
+                    responsibilities="bench",
+                    location="Tashkent",
+                    job_type=JobPosting.JobTypeChoice.FULL_TIME,
+                    experience_level=JobPosting.ExperienceLevelChoice.MIDDLE,
+                    education_required=JobPosting.EducationRequiredChoice.BACHELORS,
+                    salary_min=100,
+                    salary_max=200,
+                    deadline=deadline,
+                ) for _ in range(min(batch_size, count - offset))
+            ])
+        with connection.cursor() as cursor:
+            # Flushes the GIN pending lists and refreshes planner statistics, as autovacuum would.
+            cursor.execute(f"VACUUM ANALYZE {JobPosting._meta.db_table}")
+        self.stdout.write(f"Seeded {count} postings in {time.perf_counter() - started:.1f}s.")
+        return company
@@ -0,0 +1,30 @@
+from django.db import models
+
+
+class JobPostingQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related("company__user") \
+            .prefetch_related("skills_required") \
+            .defer("search_vector", "company__search_vector")
+
+
+class JobApplicationQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related("job_posting__company__user", "job_seeker__user") \
+            .prefetch_related("job_posting__skills_required", "job_seeker__skills") \
+            .defer("job_posting__search_vector", "job_posting__company__search_vector", "job_seeker__search_vector")
+
+    def compact(self):
+        return self.select_related("job_posting", "job_seeker") \
+            .only(
+                "id", "status", "applied_date", "updated_at",
+                "job_posting__id", "job_posting__title",
+                "job_seeker__id", "job_seeker__first_name", "job_seeker__last_name"
+            )
+
+
+class SavedJobQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related("job_posting__company__user", "job_seeker__user") \
+            .prefetch_related("job_posting__skills_required", "job_seeker__skills") \
+            .defer("job_posting__search_vector", "job_posting__company__search_vector", "job_seeker__search_vector")
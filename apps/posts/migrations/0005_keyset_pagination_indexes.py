@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-18 10:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_alter_jobapplication_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['applied_date', 'id'], name='jobapplication_applied_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['posted_date', 'id'], name='jobposting_posted_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedjob',
+            index=models.Index(fields=['job_seeker', 'saved_date', 'id'], name='savedjob_seeker_saved_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_stats_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewsFlush',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flush_id', models.CharField(blank=True, max_length=32)),
+                ('flushed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
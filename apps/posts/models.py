@@ -1,6 +1,10 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from .managers import JobApplicationQuerySet, JobPostingQuerySet, SavedJobQuerySet
+
 
 class JobPosting(models.Model):
     class JobTypeChoice(models.TextChoices):
@@ -38,6 +42,22 @@ class JobPosting(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     deadline = models.DateField()
     views_count = models.IntegerField(default=0)
+    search_vector = models.GeneratedField(
+        expression=SearchVector("title", weight="A", config="english")
+        + SearchVector("description", weight="B", config="english")
+        + SearchVector("requirements", weight="C", config="english"),
+        output_field=SearchVectorField(),
+        db_persist=True
+    )
+
+    objects = JobPostingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["posted_date", "id"], name="jobposting_posted_date_id_idx"),
+            GinIndex(fields=["search_vector"], name="jobposting_search_vector_idx"),
+            GinIndex(fields=["title"], name="jobposting_title_trgm_idx", opclasses=["gin_trgm_ops"]),
+        ]
 
     def __str__(self):
         return f"{self.company.name}: {self.title}"
@@ -60,10 +80,48 @@ class JobApplication(models.Model):
     applied_date = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = JobApplicationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["applied_date", "id"], name="jobapplication_applied_id_idx"),
+        ]
+
 
 class SavedJob(models.Model):
     job_seeker = models.ForeignKey("users.JobSeeker", on_delete=models.CASCADE, related_name="saved_jobs")
     job_posting = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name="saved_job")
     saved_date = models.DateTimeField(auto_now_add=True)
 
+    objects = SavedJobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["job_seeker", "saved_date", "id"], name="savedjob_seeker_saved_id_idx"),
+        ]
+
+
 
+
+class StatsSnapshot(models.Model):
+    class NameChoice(models.TextChoices):
+        JOB_POSTINGS = "job_postings", _("Job postings")
+        APPLICATIONS = "applications", _("Applications")
+
+    name = models.CharField(max_length=30, choices=NameChoice.choices, unique=True)
+    data = models.JSONField(default=dict)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name}: {self.computed_at}"
+
+
+class ViewsFlush(models.Model):
+    """
+    A single row holding the id of the last view buffer added to JobPosting.views_count.
+    """
+    flush_id = models.CharField(max_length=32, blank=True)
+    flushed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.flush_id}: {self.flushed_at}"
@@ -1,6 +1,38 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import LimitOffsetPagination, PageNumberPagination
+
+from apps.users.paginations import KeysetCursorPagination
 
 
 class JobPostPageNumberPagination(PageNumberPagination):
     page_size = 30
     max_page_size = 200
+
+
+class JobPostCursorPagination(KeysetCursorPagination):
+    page_size = 30
+    ordering = ('-posted_date', '-id')
+
+
+class JobApplicationCursorPagination(KeysetCursorPagination):
+    page_size = 30
+    ordering = ('-applied_date', '-id')
+
+
+class SavedJobCursorPagination(KeysetCursorPagination):
+    page_size = 30
+    ordering = ('-saved_date', '-id')
+
+
+class SearchLimitOffsetPagination(LimitOffsetPagination):
+    default_limit = 10
+    max_limit = 50
+
+    def paginate_section(self, queryset, request):
+        """
+        Slices one search section without a COUNT(*): one extra row is fetched to tell if there is more.
+        """
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        return rows[:self.limit], len(rows) > self.limit
@@ -0,0 +1,39 @@
+import logging
+import time
+
+from redis import RedisError
+
+from config.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+RECENTLY_VIEWED_KEY = "posts:recently_viewed:{user_id}"
+RECENTLY_VIEWED_LIMIT = 50
+RECENTLY_VIEWED_TTL = 60 * 60 * 24 * 30
+
+
+def add(user_id, post_id):
+    """
+    Records a viewed posting in the user's sorted set (scored by time) and trims it to the newest entries.
+    """
+    key = RECENTLY_VIEWED_KEY.format(user_id=user_id)
+    try:
+        pipeline = redis_client.pipeline()
+        pipeline.zadd(key, {post_id: time.time()})
+        pipeline.zremrangebyrank(key, 0, -RECENTLY_VIEWED_LIMIT - 1)
+        pipeline.expire(key, RECENTLY_VIEWED_TTL)
+        pipeline.execute()
+    except RedisError as e:
+        logger.warning(f"Recently viewed job could not be saved: {e}")
+
+
+def get(user_id, limit=RECENTLY_VIEWED_LIMIT):
+    """
+    Returns the ids of the postings the user viewed, newest first.
+    """
+    key = RECENTLY_VIEWED_KEY.format(user_id=user_id)
+    try:
+        return [int(post_id) for post_id in redis_client.zrevrange(key, 0, limit - 1)]
+    except RedisError as e:
+        logger.warning(f"Recently viewed jobs could not be read: {e}")
+        return []
@@ -0,0 +1,131 @@
+import logging
+
+from django.db.models import Case, Count, Q, Value, When
+from redis import RedisError
+
+from apps.users.models import JobSeeker
+from config.redis import redis_client
+
+from . import recently_viewed
+from .models import JobPosting
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDATIONS_KEY = "posts:recommendations:{user_id}"
+GENERATION_KEY = "posts:recommendations:generation"
+RECOMMENDATIONS_TTL = 60 * 30
+TOP_K = 100
+
+SKILL_WEIGHT = 5
+LOCATION_WEIGHT = 2
+EXPERIENCE_WEIGHT = 1
+EDUCATION_WEIGHT = 1
+
+PostingSkill = JobPosting.skills_required.through
+SeekerSkill = JobSeeker.skills.through
+
+
+def get_profile(user):
+    """
+    Collects the features a user is interested in from their job seeker profile and recently viewed postings.
+    """
+    profile = {"skills": set(), "locations": set(), "experience_levels": set(), "educations": set()}
+
+    profile["skills"].update(SeekerSkill.objects.filter(jobseeker__user=user).values_list("skill_id", flat=True))
+    location = JobSeeker.objects.filter(user=user).values_list("location", flat=True).first()
+    if location:
+        profile["locations"].add(location)
+
+    viewed_ids = recently_viewed.get(user.id)
+    if viewed_ids:
+        viewed_jobs = JobPosting.objects.filter(id__in=viewed_ids) \
+            .values_list("location", "experience_level", "education_required")
+        for location, experience_level, education_required in viewed_jobs:
+            profile["locations"].add(location)
+            profile["experience_levels"].add(experience_level)
+            profile["educations"].add(education_required)
+        profile["skills"].update(
+            PostingSkill.objects.filter(jobposting_id__in=viewed_ids).values_list("skill_id", flat=True)
+        )
+
+    return profile
+
+
+def rank(profile, limit=TOP_K):
+    """
+    Scores postings sharing features with the profile and returns the ids of the best ones.
+    A shared skill outweighs every other feature together, so postings sharing a skill are ranked first with a
+    join over the skills table and the rest are only scored when there are fewer than `limit` of them.
+    """
+    feature_score = sum(
+        (
+            Case(When(Q(**{f"{field}__in": values}), then=Value(weight)), default=Value(0))
+            for field, values, weight in (
+                ("location", profile["locations"], LOCATION_WEIGHT),
+                ("experience_level", profile["experience_levels"], EXPERIENCE_WEIGHT),
+                ("education_required", profile["educations"], EDUCATION_WEIGHT),
+            )
+            if values
+        ),
+        Value(0)
+    )
+
+    ids = []
+    if profile["skills"]:
+        ids = list(
+            JobPosting.objects.filter(skills_required__in=profile["skills"])
+            .annotate(score=Count("skills_required") * SKILL_WEIGHT + feature_score)
+            .order_by("-score", "-posted_date", "-id")
+            .values_list("id", flat=True)[:limit]
+        )
+
+    candidates = Q(location__in=profile["locations"]) \
+        | Q(experience_level__in=profile["experience_levels"]) \
+        | Q(education_required__in=profile["educations"])
+    if len(ids) < limit and any(profile[feature] for feature in ("locations", "experience_levels", "educations")):
+        ids += JobPosting.objects.filter(candidates) \
+            .exclude(id__in=PostingSkill.objects.filter(skill_id__in=profile["skills"]).values("jobposting_id")) \
+            .annotate(score=feature_score) \
+            .order_by("-score", "-posted_date", "-id") \
+            .values_list("id", flat=True)[:limit - len(ids)]
+    return ids
+
+
+def get_recommended_ids(user):
+    """
+    Returns the cached top-K posting ids for the user, recomputing them when the cache is missing or stale.
+    The cached value is stamped with the postings generation, so any posting change invalidates every user at once.
+    """
+    key = RECOMMENDATIONS_KEY.format(user_id=user.id)
+    try:
+        generation, cached = redis_client.mget(GENERATION_KEY, key)
+    except RedisError as e:
+        logger.warning(f"Recommendations cache could not be read: {e}")
+        return rank(get_profile(user))
+
+    generation = generation or "0"
+    if cached is not None:
+        cached_generation, _, ids = cached.partition(":")
+        if cached_generation == generation:
+            return [int(post_id) for post_id in ids.split(",") if post_id]
+
+    ids = rank(get_profile(user))
+    try:
+        redis_client.set(key, f"{generation}:{','.join(map(str, ids))}", ex=RECOMMENDATIONS_TTL)
+    except RedisError as e:
+        logger.warning(f"Recommendations cache could not be saved: {e}")
+    return ids
+
+
+def invalidate_user(*user_ids):
+    try:
+        redis_client.delete(*[RECOMMENDATIONS_KEY.format(user_id=user_id) for user_id in user_ids])
+    except RedisError as e:
+        logger.warning(f"Recommendations cache could not be invalidated: {e}")
+
+
+def invalidate_all():
+    try:
+        redis_client.incr(GENERATION_KEY)
+    except RedisError as e:
+        logger.warning(f"Recommendations cache could not be invalidated: {e}")
@@ -0,0 +1,64 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+from apps.users.models import Company, JobSeeker
+
+from .models import JobPosting
+
+# ts_rank has to read every matched vector, so broad queries only rank the newest matches.
+RANKED_CANDIDATES_LIMIT = 1000
+
+
+def full_text(queryset, query, config):
+    search_query = SearchQuery(query, config=config, search_type="websearch")
+    candidates = queryset.model.objects.filter(search_vector=search_query) \
+        .order_by("-id") \
+        .values("id")[:RANKED_CANDIDATES_LIMIT]
+    return queryset.filter(id__in=candidates) \
+        .annotate(rank=SearchRank(F("search_vector"), search_query)) \
+        .order_by("-rank", "-id")
+
+
+def trigram(queryset, query, *fields):
+    """
+    Typo-tolerant fallback: `trigram_similar` uses the gin_trgm_ops indexes and the
+    similarity is only computed for the newest matches.
+    """
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f"{field}__trigram_similar": query})
+
+    candidates = queryset.model.objects.filter(condition) \
+        .order_by("-id") \
+        .values("id")[:RANKED_CANDIDATES_LIMIT]
+
+    similarities = [TrigramSimilarity(field, query) for field in fields]
+    similarity = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+    return queryset.filter(id__in=candidates).annotate(similarity=similarity).order_by("-similarity", "-id")
+
+
+def search_job_postings(query):
+    queryset = JobPosting.objects.with_related()
+    ranked = full_text(queryset, query, "english")
+    if ranked.exists():
+        return ranked
+    return trigram(queryset, query, "title")
+
+
+def search_companies(query):
+    queryset = Company.objects.select_related("user").defer("search_vector")
+    ranked = full_text(queryset, query, "simple")
+    if ranked.exists():
+        return ranked
+    return trigram(queryset, query, "name")
+
+
+def search_profiles(query):
+    queryset = JobSeeker.objects.select_related("user").prefetch_related("skills").defer("search_vector")
+    if query.lstrip("+").isdigit():
+        return queryset.filter(phone_number__contains=query).order_by("-id")
+    ranked = full_text(queryset, query, "simple")
+    if ranked.exists():
+        return ranked
+    return trigram(queryset, query, "first_name", "last_name")
@@ -1,11 +1,23 @@
 from django.core.validators import FileExtensionValidator
 from rest_framework import serializers
 
-from apps.users.models import JobSeeker
-
 from . import models
 
 
+def get_active_company(user):
+    company = user.get_company()
+    if company is None or not company.is_active:
+        raise serializers.ValidationError({"error": "Sizga tegishli kompaniya profile tasdiqlanmagan."})
+    return company
+
+
+def get_job_seeker(user):
+    job_seeker = user.get_profile()
+    if job_seeker is None:
+        raise serializers.ValidationError({"error": "Sizga tegishli job seeker profile topilmadi."})
+    return job_seeker
+
+
 class JopPostingSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.JobPosting
@@ -13,10 +25,7 @@ class JopPostingSerializer(serializers.ModelSerializer):
 
 
     def create(self, validated_data):
-        from apps.users.models import Company
-        company = Company.objects.get(user=self.context['request'].user)
-        if company.is_active == False:
-            raise serializers.ValidationError({"error": "Sizga tegishli kompaniya profile tasdiqlanmagan."})
+        company = get_active_company(self.context['request'].user)
         skills = validated_data.pop("skills_required", [])
         post = models.JobPosting.objects.create(company=company, **validated_data)
         post.skills_required.set(skills)
@@ -25,10 +34,7 @@ class JopPostingSerializer(serializers.ModelSerializer):
 
 
     def update(self, instance, validated_data):
-        from apps.users.models import Company
-        company = Company.objects.get(user=self.context['request'].user)
-        if company.is_active == False:
-            raise serializers.ValidationError({"error": "Sizga tegishli kompaniya profile tasdiqlanmagan."})
+        company = get_active_company(self.context['request'].user)
         for key, value in validated_data.items():
             setattr(instance, key, value)
         instance.company = company
@@ -65,21 +71,20 @@ class JobApplicationSerializer(serializers.ModelSerializer):
 
 
     def create(self, validated_data):
-        job_seeker = JobSeeker.objects.get(user=self.context['request'].user)
-        job_posting = models.JobPosting.objects.get(id=validated_data['job_posting'])
-        if models.JobApplication.objects.filter(job_posting=validated_data['job_posting'], job_seeker=job_seeker).exists():
+        user = self.context['request'].user
+        job_seeker = get_job_seeker(user)
+        job_posting = validated_data['job_posting']
+        if models.JobApplication.objects.filter(job_posting=job_posting, job_seeker=job_seeker).exists():
             raise serializers.ValidationError({"error": "Siz bu post ga alaqachon ariza topshirgansiz."})
-        from apps.users.models import Company
-        company = Company.objects.get(user=self.context['request'].user)
-        if job_posting.company in company:
+        if job_posting.company_id == user.company_id:
             raise serializers.ValidationError({"error": "Siz o'znigizni postingizga ariza bera olmaysiz."})
         job_application = models.JobApplication.objects.create(job_seeker=job_seeker, **validated_data)
         return job_application
 
 
     def update(self, instance, validated_data):
-        job_seeker = JobSeeker.objects.get(user=self.context['request'].user)
-        if job_seeker == self.instance.job_seeker:
+        job_seeker = self.context['request'].user.get_profile()
+        if job_seeker is not None and job_seeker.id == self.instance.job_seeker_id:
             status = validated_data.get('status')
 
             if status and status != self.instance.status:
@@ -111,6 +116,23 @@ class JobApplicationSerializer(serializers.ModelSerializer):
         return representation
 
 
+class JobApplicationCompactSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.JobApplication
+        fields = ('id', 'status', 'applied_date', 'updated_at')
+
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        representation['job_posting'] = {"id": instance.job_posting.id, "title": instance.job_posting.title}
+        representation['job_seeker'] = {
+            "id": instance.job_seeker.id,
+            "first_name": instance.job_seeker.first_name,
+            "last_name": instance.job_seeker.last_name
+        }
+        return representation
+
+
 class SavedJobSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.SavedJob
@@ -127,7 +149,7 @@ class SavedJobSerializer(serializers.ModelSerializer):
 
 
     def create(self, validated_data):
-        job_seeker = JobSeeker.objects.get(user=self.context['request'].user)
+        job_seeker = get_job_seeker(self.context['request'].user)
         saved_job = models.SavedJob.objects.create(job_seeker=job_seeker, **validated_data)
         return saved_job
 
@@ -137,7 +159,7 @@ class SavedJobSerializer(serializers.ModelSerializer):
         for key, value in validated_data.items():
             setattr(instance, key, value)
 
-        job_seeker = JobSeeker.objects.get(user=self.context['request'].user)
+        job_seeker = get_job_seeker(self.context['request'].user)
         instance.job_seeker = job_seeker
         instance.save()
         return instance
@@ -0,0 +1,47 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.notifications.models import Subscription
+from apps.users.models import JobSeeker
+
+from . import recommendations
+from .models import JobApplication, JobPosting
+
+
+@receiver(post_save, sender=JobPosting)
+@receiver(post_delete, sender=JobPosting)
+def invalidate_recommendations(sender, **kwargs):
+    recommendations.invalidate_all()
+
+
+@receiver(m2m_changed, sender=JobPosting.skills_required.through)
+def invalidate_skills_recommendations(sender, action, **kwargs):
+    if action.startswith("post_"):
+        recommendations.invalidate_all()
+
+
+@receiver(post_save, sender=JobSeeker)
+def invalidate_job_seeker_recommendations(sender, instance, **kwargs):
+    recommendations.invalidate_user(instance.user_id)
+
+
+@receiver(m2m_changed, sender=JobSeeker.skills.through)
+def invalidate_job_seeker_skills_recommendations(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        recommendations.invalidate_user(instance.user_id)
+    elif pk_set:
+        recommendations.invalidate_user(*JobSeeker.objects.filter(id__in=pk_set).values_list("user_id", flat=True))
+
+
+@receiver(post_save, sender=JobApplication)
+def subscribe_applicant_to_company(sender, instance, created, **kwargs):
+    if created:
+        Subscription.objects.bulk_create([
+            Subscription(
+                user_id=instance.job_seeker.user_id,
+                target_type=Subscription.TargetType.COMPANY,
+                target=str(instance.job_posting.company_id)
+            )
+        ], ignore_conflicts=True)
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.skills.models import Skill
+
+from .models import JobApplication, JobPosting, StatsSnapshot
+
+MOST_DEMANDED_SKILLS_LIMIT = 10
+
+
+def job_posting_stats():
+    today = timezone.now()
+    one_month_ago = today - timedelta(days=30)
+
+    active_posts = JobPosting.objects.filter(is_active=True)
+    expired_posts = JobPosting.objects.filter(deadline__lte=today)
+    new_job_postings_last_month = JobPosting.objects.filter(posted_date__gte=one_month_ago)
+
+    job_postings_by_type = JobPosting.objects.values("job_type") \
+        .annotate(count=Count("job_type")) \
+        .order_by("-count")
+
+    job_posting_by_experience_level = JobPosting.objects.values("experience_level") \
+        .annotate(count=Count("experience_level")) \
+        .order_by("-count")
+
+    job_postings_by_location = JobPosting.objects.values("location") \
+        .annotate(count=Count("location")) \
+        .order_by("-count")
+
+    most_demanded_skills = Skill.objects \
+        .annotate(count=Count("job_posts")) \
+        .order_by("-count")[:MOST_DEMANDED_SKILLS_LIMIT]
+
+    return {
+        "total_job_postings": JobPosting.objects.count(),
+        "active_job_postings": active_posts.count(),
+        "expired_job_postings": expired_posts.count(),
+        "new_job_postings_last_month": new_job_postings_last_month.count(),
+        "job_postings_by_type": [{"type": post['job_type'], "count": post['count']} for post in job_postings_by_type],
+        "job_posting_by_experience_level": [{"level": post['experience_level'], "count": post['count']} for post in job_posting_by_experience_level],
+        "job_postings_by_location": [{"location": post["location"], "count": post["count"]} for post in job_postings_by_location],
+        "most_demanded_skills": [{"skill": skill.name, "count": skill.count} for skill in most_demanded_skills]
+    }
+
+
+def application_stats():
+    """
+    Computes the application dashboard in two queries: one conditional aggregation over postings grouped by
+    job type, and the most applied postings with their companies.
+    """
+    one_month_ago = timezone.now() - timedelta(days=30)
+    statuses = JobApplication.StatusChoice.values
+
+    by_job_type = JobPosting.objects.order_by().values("job_type").annotate(
+        postings=Count("id", distinct=True),
+        applications=Count("job_applications"),
+        applications_last_month=Count("job_applications", filter=Q(job_applications__applied_date__gte=one_month_ago)),
+        **{
+            f"status_{index}": Count("job_applications", filter=Q(job_applications__status=application_status))
+            for index, application_status in enumerate(statuses)
+        }
+    )
+
+    total_job_postings = total_applications = applications_last_month = 0
+    applications_by_status = dict.fromkeys(statuses, 0)
+    applications_by_job_type = []
+    for row in by_job_type:
+        total_job_postings += row["postings"]
+        total_applications += row["applications"]
+        applications_last_month += row["applications_last_month"]
+        for index, application_status in enumerate(statuses):
+            applications_by_status[application_status] += row[f"status_{index}"]
+        applications_by_job_type.append({"type": row["job_type"], "count": row["applications"]})
+
+    most_applied_jobs = JobPosting.objects.select_related("company") \
+        .only("id", "title", "company__name") \
+        .annotate(num_applications=Count('job_applications')) \
+        .order_by('-num_applications', '-id')[:10]
+
+    return {
+        "total_applications": total_applications,
+        "applications_last_month": applications_last_month,
+        "applications_by_status": sorted(
+            ({"status": application_status, "count": count} for application_status, count in applications_by_status.items() if count),
+            key=lambda application: -application["count"]
+        ),
+        "applications_by_job_type": sorted(applications_by_job_type, key=lambda job_type: -job_type["count"]),
+        "average_application_per_job": total_applications / total_job_postings if total_job_postings > 0 else 0,
+        "most_applied_jobs": [{"id": job.id, "title": job.title, "company": job.company.name, "applications_count": job.num_applications} for job in most_applied_jobs]
+    }
+
+
+CALCULATORS = {
+    StatsSnapshot.NameChoice.JOB_POSTINGS: job_posting_stats,
+    StatsSnapshot.NameChoice.APPLICATIONS: application_stats,
+}
+
+
+def refresh_snapshot(name):
+    data = CALCULATORS[name]()
+    snapshot, _ = StatsSnapshot.objects.update_or_create(
+        name=name,
+        defaults={"data": data, "computed_at": timezone.now()}
+    )
+    return snapshot
+
+
+def get_stats(name, live=False):
+    """
+    Returns the stored snapshot with its `computed_at` timestamp, or freshly computed stats when `live` is set.
+    """
+    if live:
+        return {**CALCULATORS[name](), "computed_at": timezone.now(), "live": True}
+
+    snapshot = StatsSnapshot.objects.filter(name=name).first() or refresh_snapshot(name)
+    return {**snapshot.data, "computed_at": snapshot.computed_at, "live": False}
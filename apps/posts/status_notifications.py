@@ -0,0 +1,54 @@
+import logging
+
+from django.conf import settings
+from redis import RedisError
+
+from config.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "posts:application_status:pending:{application_id}"
+NOTIFIED_KEY = "posts:application_status:notified:{application_id}"
+NOTIFIED_TTL = 60 * 60 * 24 * 30
+
+
+def schedule(application_id):
+    """
+    Queues one status notification for the application, delayed by APPLICATION_STATUS_NOTIFICATION_DELAY seconds.
+    Changes made while a notification is pending are coalesced into it, because the task reads the status only when it runs.
+    """
+    from .tasks import update_status_application_notification
+
+    delay = settings.APPLICATION_STATUS_NOTIFICATION_DELAY
+    try:
+        queued = redis_client.set(PENDING_KEY.format(application_id=application_id), 1, nx=True, ex=delay * 2 + 60)
+    except RedisError as e:
+        logger.warning(f"Status notification of application {application_id} could not be coalesced: {e}")
+        queued = True
+
+    if queued:
+        update_status_application_notification.apply_async((application_id,), countdown=delay)
+    return bool(queued)
+
+
+def release(application_id):
+    """
+    Ends the pending window, so a change made from now on queues a new notification.
+    Called before the task reads the status, so no change can fall between two notifications.
+    """
+    try:
+        redis_client.delete(PENDING_KEY.format(application_id=application_id))
+    except RedisError as e:
+        logger.warning(f"Status notification of application {application_id} could not be released: {e}")
+
+
+def mark_notified(application_id, status):
+    """
+    Remembers the status the job seeker is notified of and returns False when it was already the last one sent.
+    """
+    try:
+        notified_status = redis_client.set(NOTIFIED_KEY.format(application_id=application_id), status, ex=NOTIFIED_TTL, get=True)
+    except RedisError as e:
+        logger.warning(f"Notified status of application {application_id} could not be saved: {e}")
+        return True
+    return notified_status != status
@@ -1,44 +1,80 @@
 from __future__ import absolute_import, unicode_literals
 
-from celery import shared_task
+import logging
+
+from celery import group, shared_task
+from django.conf import settings
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
 
 @shared_task
-def update_status_application_notification(user_id, id, post_title):
-    message = f"Sizning '{post_title}' vakansiyasiga topshirgan arizangiz ko'rib chiqilmoqda."
+def update_status_application_notification(application_id, *legacy_args):
     from apps.notifications.models import Notification
-    from apps.users.models import User
-    user = User.objects.get(id=user_id)
-    Notification.objects.create(user=user, message=message, notification_type=Notification.NotificationType.APPLICATION_STATUS_CHANGE, related_object_id=id)
+
+    # Tasks queued before the notifications were coalesced carry (user_id, application_id, post_title). They are
+    # handled as a change of that application. Drop once the queues that held them have drained.
+    if legacy_args:
+        application_id = legacy_args[0]
+
+    from . import status_notifications
+    from .models import JobApplication
+
+    status_notifications.release(application_id)
+    application = JobApplication.objects.filter(id=application_id) \
+        .values("status", "job_posting__title", "job_seeker__user_id").first()
+    if application is None or not status_notifications.mark_notified(application_id, application["status"]):
+        return False
+
+    status = JobApplication.StatusChoice(application["status"]).label
+    message = f"Sizning '{application['job_posting__title']}' vakansiyasiga topshirgan arizangiz holati: {status}."
+    Notification.objects.notify(
+        application["job_seeker__user_id"], message, Notification.NotificationType.APPLICATION_STATUS_CHANGE, application_id
+    )
+    return True
 
 
 @shared_task
 def new_posting_notification(post_id, post_title, company_id):
-    from apps.notifications.models import Notification
-    from apps.users.models import Company
+    from apps.notifications.models import Notification, Subscription
+    from apps.notifications.tasks import send_notifications
 
-    from .models import JobApplication, JobPosting
+    from .models import JobPosting
+
+    post = JobPosting.objects.values("location", "company__name").get(id=post_id)
+    company_name = post["company__name"]
+    skill_ids = list(JobPosting.skills_required.through.objects.filter(jobposting_id=post_id).values_list("skill_id", flat=True))
+    user_ids = list(Subscription.objects.audience(company_id, skill_ids, post["location"]))
 
-    company = Company.objects.get(id=company_id)
-    posts = JobPosting.objects.filter(company=company)
-    users_to_notify = set()
+    message = f"Yangi vakansiya: {post_title} - {company_name}"
+    notification_type = Notification.NotificationType.JOB_POSTING
+    chunk_size = settings.NOTIFICATION_FANOUT_CHUNK_SIZE
 
-    for post in posts:
-        applications = JobApplication.objects.filter(job_posting=post)
+    if len(user_ids) <= chunk_size:
+        sent = Notification.objects.bulk_notify(user_ids, message, notification_type, post_id)
+        logger.info(f"Posting {post_id}: {sent} notifications sent.")
+        return {"recipients": len(user_ids), "chunks": 0}
 
-        for application in applications:
-            users_to_notify.add(application.job_seeker.user)
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+    group(send_notifications.s(chunk, message, notification_type, post_id) for chunk in chunks).apply_async()
+    logger.info(f"Posting {post_id}: {len(user_ids)} notifications queued in {len(chunks)} chunks.")
+    return {"recipients": len(user_ids), "chunks": len(chunks)}
 
-    message = f"Yangi vakansiya: {post_title} - {company.name}"
 
-    for user in users_to_notify:
-        Notification.objects.create(
-            user=user,
-            message=message,
-            notification_type=Notification.NotificationType.JOB_POSTING,
-            related_object_id=post_id
-        )
+@shared_task
+def flush_post_views():
+    from .counters import flush_views
+    return flush_views()
+
+
+@shared_task
+def refresh_stats_snapshots():
+    from .models import StatsSnapshot
+    from .stats import refresh_snapshot
+    for name in StatsSnapshot.NameChoice.values:
+        refresh_snapshot(name)
+
 
 @shared_task
 def update_active_post():
@@ -1,8 +1,92 @@
+import tempfile
 from datetime import timedelta
+from unittest import mock
 
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.notifications.models import Notification, Subscription
+from apps.posts import (
+    counters,
+    recently_viewed,
+    recommendations,
+    stats,
+    status_notifications,
+    tasks,
+)
+from apps.posts.models import JobApplication, JobPosting, StatsSnapshot
+from apps.skills.models import Skill
+from apps.users import authentication
+from apps.users.models import Company, JobSeeker, User
+
+
+def create_company(username="employer"):
+    user = User.objects.create_user(username=username, email=f"{username}@gmail.com", password="132546587", user_type=User.UserTypeChoice.EMPLOYER)
+    return Company.objects.create(
+        user=user,
+        name="Test",
+        description="test",
+        website=f"https://{username}.uz",
+        industry="IT",
+        location="test",
+        founded_year=2020,
+        employees_count=10,
+        is_active=True
+    )
+
+
+def create_job_seekers(skills, count):
+    job_seekers = []
+    for i in range(count):
+        user = User.objects.create_user(username=f"seeker{i}", email=f"seeker{i}@gmail.com", password="132546587")
+        job_seeker = JobSeeker.objects.create(
+            user=user,
+            first_name=f"Test {i}",
+            last_name="Test",
+            date_of_birth="2000-01-01",
+            phone_number="+998901234567",
+            location="test",
+            bio="test",
+            experience_years=1,
+            education_level="Bachelors"
+        )
+        job_seeker.skills.set(skills)
+        job_seekers.append(job_seeker)
+    return job_seekers
+
+
+def create_skills():
+    return [
+        Skill.objects.create(name="Python", category=Skill.SkillCategoryChoice.PROGRAMMING),
+        Skill.objects.create(name="Django", category=Skill.SkillCategoryChoice.FRAMEWORK)
+    ]
+
+
+def create_job_postings(company, skills, count, title="Test"):
+    for i in range(count):
+        post = JobPosting.objects.create(
+            company=company,
+            title=f"{title} {i}",
+            description="test",
+            requirements="test",
+            responsibilities="test",
+            location="test",
+            job_type=JobPosting.JobTypeChoice.FULL_TIME,
+            experience_level=JobPosting.ExperienceLevelChoice.ENTRY,
+            education_required=JobPosting.EducationRequiredChoice.BACHELORS,
+            salary_min=100,
+            salary_max=200,
+            deadline=timezone.now().date() + timedelta(days=7),
+            is_active=True
+        )
+        post.skills_required.set(skills)
+    return post
 
 
 class JobPostingListTestCase(APITestCase):
@@ -15,6 +99,48 @@ class JobPostingListTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
+class JobPostingListQueryCountTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = "/api/job-postings/list/"
+        self.company = create_company()
+        self.skills = create_skills()
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        create_job_postings(self.company, self.skills, 2)
+        small_page_queries = self.count_queries()
+        create_job_postings(self.company, self.skills, 20)
+        self.assertEqual(self.count_queries(), small_page_queries)
+
+
+class JobPostingListCursorPaginationTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = "/api/job-postings/list/?pagination=cursor"
+        create_job_postings(create_company(), create_skills(), 35)
+
+    def test_cursor_pages(self):
+        response = self.client.get(self.url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first_page = response.data['data']
+        self.assertNotIn("count", first_page)
+        self.assertEqual(len(first_page['results']), 30)
+
+        response = self.client.get(first_page['next'], format='json')
+        second_page = response.data['data']
+        self.assertEqual(len(second_page['results']), 5)
+        self.assertIsNone(second_page['next'])
+
+        ids = [post['id'] for post in first_page['results'] + second_page['results']]
+        self.assertEqual(ids, list(JobPosting.objects.order_by('-posted_date', '-id').values_list('id', flat=True)))
+
+
 class JobPostingCreateTestCase(APITestCase):
     def setUp(self):
         self.client = APIClient()
@@ -48,6 +174,88 @@ class JobPostingRetrieveTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
+class JobPostingViewsCounterTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.post = create_job_postings(create_company(), create_skills(), 1)
+        self.url = f"/api/job-postings/detail/{self.post.id}/"
+        counters.redis_client.delete(counters.VIEWS_KEY, counters.FLUSHING_VIEWS_KEY, counters.FLUSH_LOCK_KEY)
+
+    def tearDown(self):
+        counters.redis_client.delete(counters.VIEWS_KEY, counters.FLUSHING_VIEWS_KEY, counters.FLUSH_LOCK_KEY)
+
+    def test_views_are_buffered_and_flushed(self):
+        updated_at = self.post.updated_at
+        for views_count in range(1, 4):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.url, format='json')
+            self.assertEqual(response.data['data']['views_count'], views_count)
+            self.assertFalse([query for query in context.captured_queries if query['sql'].startswith("UPDATE")])
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(tasks.flush_post_views(), 1)
+        self.assertFalse(counters.redis_client.exists(counters.FLUSHING_VIEWS_KEY))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 3)
+        self.assertEqual(self.post.updated_at, updated_at)
+        self.assertEqual(self.client.get(self.url, format='json').data['data']['views_count'], 4)
+
+    def test_overlapping_flushes_apply_a_buffer_once(self):
+        for _ in range(3):
+            counters.increment_views(self.post.id)
+
+        counters.redis_client.set(counters.FLUSH_LOCK_KEY, "another-worker")
+        self.assertEqual(counters.flush_views(), 0)
+        counters.redis_client.delete(counters.FLUSH_LOCK_KEY)
+
+        # The buffer is not deleted, as if the worker died right after the commit.
+        with self.captureOnCommitCallbacks(execute=False):
+            self.assertEqual(counters.flush_views(), 1)
+        counters.increment_views(self.post.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(counters.flush_views(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(counters.flush_views(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 4)
+        self.assertFalse(counters.redis_client.exists(counters.FLUSH_LOCK_KEY))
+
+
+class RecentlyViewedTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        company = create_company()
+        skills = create_skills()
+        self.posts = [create_job_postings(company, skills, 1, title=f"Post {i}") for i in range(2)]
+        self.user = User.objects.create_user(username="viewer", email="viewer@gmail.com", password="132546587")
+        self.key = recently_viewed.RECENTLY_VIEWED_KEY.format(user_id=self.user.id)
+        redis_client = recently_viewed.redis_client
+        redis_client.delete(self.key)
+        self.addCleanup(redis_client.delete, self.key, counters.VIEWS_KEY)
+
+    def test_detail_view_records_recently_viewed(self):
+        self.client.force_authenticate(user=self.user)
+        for post in self.posts + self.posts[:1]:
+            response = self.client.get(f"/api/job-postings/detail/{post.id}/", format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(recently_viewed.get(self.user.id), [self.posts[0].id, self.posts[1].id])
+        self.assertNotIn("viewed_jobs", self.client.session)
+
+    def test_store_is_bounded(self):
+        for post_id in range(recently_viewed.RECENTLY_VIEWED_LIMIT + 10):
+            recently_viewed.add(self.user.id, post_id)
+        viewed = recently_viewed.get(self.user.id)
+        self.assertEqual(len(viewed), recently_viewed.RECENTLY_VIEWED_LIMIT)
+        self.assertEqual(viewed[0], recently_viewed.RECENTLY_VIEWED_LIMIT + 9)
+        self.assertGreater(recently_viewed.redis_client.ttl(self.key), 0)
+
+
 class JobPostingRetrieveUpdateDestroyTestCase(APITestCase):
     def setUp(self):
         self.client = APIClient()
@@ -77,6 +285,44 @@ class JobPostingRecommendedTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
+class JobPostingRecommendationTestCase(APITestCase):
+    def setUp(self):
+        self.url = "/api/job-postings/recommended/"
+        self.client = APIClient()
+        company = create_company()
+        self.python, self.django = create_skills()
+        self.job_seeker = create_job_seekers([self.python], 1)[0]
+        self.best = create_job_postings(company, [self.python, self.django], 1, title="Best")
+        self.skill_only = create_job_postings(company, [self.python], 1, title="Skill")
+        self.skill_only.location = "Samarkand"
+        self.skill_only.save()
+        self.unrelated = create_job_postings(company, [self.django], 1, title="Unrelated")
+        self.unrelated.location = "Samarkand"
+        self.unrelated.save()
+        self.key = recommendations.RECOMMENDATIONS_KEY.format(user_id=self.job_seeker.user_id)
+        recommendations.redis_client.delete(self.key)
+        self.addCleanup(recommendations.redis_client.delete, self.key)
+
+    def test_recommendations_are_ranked(self):
+        self.client.force_authenticate(user=self.job_seeker.user)
+        response = self.client.get(self.url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [post['id'] for post in response.data['data']['results']]
+        self.assertEqual(ids, [self.best.id, self.skill_only.id])
+
+    def test_recommendations_are_cached_and_invalidated(self):
+        ids = recommendations.get_recommended_ids(self.job_seeker.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(recommendations.get_recommended_ids(self.job_seeker.user), ids)
+
+        self.job_seeker.skills.set([self.django])
+        self.assertIsNone(recommendations.redis_client.get(self.key))
+        self.assertIn(self.unrelated.id, recommendations.get_recommended_ids(self.job_seeker.user))
+
+        self.unrelated.delete()
+        self.assertNotIn(self.unrelated.id, recommendations.get_recommended_ids(self.job_seeker.user))
+
+
 class JobApplicationListCreateTestCase(APITestCase):
     def setUp(self):
         self.url = "/api/applications/"
@@ -92,6 +338,165 @@ class JobApplicationListCreateTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
 
+class JobPostingApplicationListQueryCountTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        company = create_company()
+        self.skills = create_skills()
+        self.post = create_job_postings(company, self.skills, 1)
+        self.url = f"/api/job-postings/{self.post.id}/applications/"
+        self.client.force_authenticate(user=company.user)
+
+    def create_applications(self, job_seekers):
+        for job_seeker in job_seekers:
+            JobApplication.objects.create(job_posting=self.post, job_seeker=job_seeker, cover_later="test", resume="resume.pdf")
+
+    def count_queries(self, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, format='json', **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        self.create_applications(create_job_seekers(self.skills, 12))
+        first_count, _ = self.count_queries()
+        JobApplication.objects.all().delete()
+        self.create_applications(JobSeeker.objects.all()[:2])
+        second_count, _ = self.count_queries()
+        self.assertEqual(first_count, second_count)
+
+    def test_compact_representation(self):
+        self.create_applications(create_job_seekers(self.skills, 3))
+        _, response = self.count_queries(HTTP_ACCEPT="application/json; version=2.0")
+        application = response.data['data']['results'][0]
+        self.assertEqual(application['job_posting'], {"id": self.post.id, "title": self.post.title})
+        self.assertEqual(set(application['job_seeker']), {"id", "first_name", "last_name"})
+        self.assertNotIn("cover_later", application)
+
+
+class RoleResolutionTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.company = create_company()
+        self.skills = create_skills()
+        self.post = create_job_postings(self.company, self.skills, 1)
+        self.job_seeker = create_job_seekers(self.skills, 1)[0]
+        User.objects.filter(id__in=[self.company.user_id, self.job_seeker.user_id]).update(is_active=True)
+        self.addCleanup(authentication.invalidate, self.company.user_id, self.job_seeker.user_id)
+
+    def request(self, user_id, method, url, data, **kwargs):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(User(id=user_id))}")
+        authentication.load(user_id)
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data, **kwargs)
+        for table in ("users_user", "users_jobseeker", "users_company"):
+            loads = [query for query in context.captured_queries if f'FROM "{table}"' in query["sql"]]
+            self.assertLessEqual(len(loads), 1, loads)
+        return response
+
+    def test_application_loads_each_profile_once(self):
+        resume = SimpleUploadedFile("resume.pdf", b"resume", content_type="application/pdf")
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            response = self.request(self.job_seeker.user_id, "post", "/api/applications/", {"job_posting": self.post.id, "cover_later": "test", "resume": resume})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertTrue(JobApplication.objects.filter(job_posting=self.post, job_seeker=self.job_seeker).exists())
+
+    def test_posting_loads_the_company_once(self):
+        data = {
+            "title": "Backend", "location": "test", "job_type": "Full time", "experience_level": "Entry", "salary_min": 100,
+            "salary_max": 200, "deadline": timezone.now().date() + timedelta(days=7), "requirements": "test",
+            "responsibilities": "test", "education_required": "Bachelors", "skills_required": [skill.id for skill in self.skills]
+        }
+        response = self.request(self.company.user_id, "post", "/api/job-postings/announce/", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(JobPosting.objects.get(title="Backend").company, self.company)
+
+
+class NewPostingNotificationTestCase(APITestCase):
+    def setUp(self):
+        self.company = create_company()
+        skills = create_skills()
+        first_post = create_job_postings(self.company, skills, 1, title="First")
+        self.post = create_job_postings(self.company, skills, 1, title="Second")
+        self.job_seekers = create_job_seekers(skills, 3)
+        for job_seeker in self.job_seekers:
+            JobApplication.objects.create(job_posting=first_post, job_seeker=job_seeker, cover_later="test", resume="resume.pdf")
+        JobApplication.objects.create(job_posting=self.post, job_seeker=self.job_seekers[0], cover_later="test", resume="resume.pdf")
+
+    @override_settings(NOTIFICATION_BULK_BATCH_SIZE=2)
+    def test_notifications_are_bulk_created(self):
+        with self.assertNumQueries(5):
+            result = tasks.new_posting_notification(self.post.id, self.post.title, self.company.id)
+        self.assertEqual(result, {"recipients": 3, "chunks": 0})
+        self.assertEqual(
+            sorted(Notification.objects.filter(related_object_id=self.post.id).values_list("user_id", flat=True)),
+            sorted(job_seeker.user_id for job_seeker in self.job_seekers)
+        )
+
+    def test_skill_and_location_subscribers_are_notified(self):
+        Subscription.objects.all().delete()
+        Subscription.objects.create(user=self.job_seekers[0].user, target_type=Subscription.TargetType.SKILL, target=str(self.post.skills_required.first().id))
+        Subscription.objects.create(user=self.job_seekers[1].user, target_type=Subscription.TargetType.LOCATION, target="test")
+        Subscription.objects.create(user=self.job_seekers[2].user, target_type=Subscription.TargetType.LOCATION, target="samarkand")
+
+        result = tasks.new_posting_notification(self.post.id, self.post.title, self.company.id)
+        self.assertEqual(result, {"recipients": 2, "chunks": 0})
+        self.assertEqual(
+            sorted(Notification.objects.values_list("user_id", flat=True)),
+            sorted([self.job_seekers[0].user_id, self.job_seekers[1].user_id])
+        )
+
+    @override_settings(NOTIFICATION_FANOUT_CHUNK_SIZE=2)
+    def test_large_audiences_are_chunked(self):
+        with mock.patch("apps.posts.tasks.group") as group:
+            result = tasks.new_posting_notification(self.post.id, self.post.title, self.company.id)
+        self.assertEqual(result, {"recipients": 3, "chunks": 2})
+        chunks = [signature.args[0] for signature in group.call_args.args[0]]
+        self.assertEqual(sorted(sum(chunks, [])), sorted(job_seeker.user_id for job_seeker in self.job_seekers))
+        self.assertFalse(Notification.objects.exists())
+
+
+class StatusNotificationTestCase(APITestCase):
+    def setUp(self):
+        company = create_company()
+        skills = create_skills()
+        post = create_job_postings(company, skills, 1)
+        self.job_seeker = create_job_seekers(skills, 1)[0]
+        self.application = JobApplication.objects.create(job_posting=post, job_seeker=self.job_seeker, cover_later="test", resume="resume.pdf")
+        for key in (status_notifications.PENDING_KEY, status_notifications.NOTIFIED_KEY):
+            self.addCleanup(status_notifications.redis_client.delete, key.format(application_id=self.application.id))
+
+    def change_status(self, status):
+        self.application.status = status
+        self.application.save()
+        return status_notifications.schedule(self.application.id)
+
+    def test_rapid_changes_are_coalesced(self):
+        with mock.patch("apps.posts.tasks.update_status_application_notification.apply_async") as apply_async:
+            self.assertTrue(self.change_status(JobApplication.StatusChoice.SHORTLISTED))
+            self.assertFalse(self.change_status(JobApplication.StatusChoice.REJECTED))
+            self.assertFalse(self.change_status(JobApplication.StatusChoice.OFFERED))
+        apply_async.assert_called_once_with((self.application.id,), countdown=60)
+
+        self.assertTrue(tasks.update_status_application_notification(self.application.id))
+        notification = Notification.objects.get()
+        self.assertEqual(notification.user_id, self.job_seeker.user_id)
+        self.assertEqual(notification.related_object_id, self.application.id)
+        self.assertIn("Offered", notification.message)
+
+        with mock.patch("apps.posts.tasks.update_status_application_notification.apply_async") as apply_async:
+            self.assertTrue(self.change_status(JobApplication.StatusChoice.HIRED))
+            self.change_status(JobApplication.StatusChoice.OFFERED)
+        self.assertFalse(tasks.update_status_application_notification(self.application.id))
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_task_queued_with_the_old_arguments_is_handled(self):
+        self.application.status = JobApplication.StatusChoice.SHORTLISTED
+        self.application.save()
+        self.assertTrue(tasks.update_status_application_notification(1, self.application.id, "Test 0"))
+        self.assertEqual(Notification.objects.get().user_id, self.job_seeker.user_id)
+
+
 class JobApplicationRetrieveTestCase(APITestCase):
     def setUp(self):
         self.url = "/api/applications/detail/1/"
@@ -185,3 +590,109 @@ class JobApplicationStatsListTestCase(APITestCase):
     def test_list_get(self):
         response = self.client.get(self.url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class StatsSnapshotTestCase(APITestCase):
+    def setUp(self):
+        self.url = "/api/stats/job-postings/"
+        self.client = APIClient()
+        self.company = create_company()
+        self.skills = create_skills()
+        create_job_postings(self.company, self.skills, 2)
+        tasks.refresh_stats_snapshots()
+        create_job_postings(self.company, self.skills, 1, title="New")
+
+    def test_snapshot_is_served(self):
+        self.client.force_authenticate(user=self.company.user)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(data['total_job_postings'], 2)
+        self.assertFalse(data['live'])
+        self.assertEqual(data['computed_at'], StatsSnapshot.objects.get(name=StatsSnapshot.NameChoice.JOB_POSTINGS).computed_at)
+
+    def test_live_stats_are_admin_only(self):
+        self.client.force_authenticate(user=self.company.user)
+        response = self.client.get(self.url, {"live": 1}, format='json')
+        self.assertEqual(response.data['data']['total_job_postings'], 2)
+
+        admin = User.objects.create_superuser(username="admin", email="admin@gmail.com", password="132546587")
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(self.url, {"live": 1}, format='json')
+        self.assertEqual(response.data['data']['total_job_postings'], 3)
+        self.assertTrue(response.data['data']['live'])
+
+
+class ApplicationStatsTestCase(APITestCase):
+    def setUp(self):
+        company = create_company()
+        skills = create_skills()
+        job_seekers = create_job_seekers(skills, 3)
+        self.full_time = create_job_postings(company, skills, 2)
+        self.internship = create_job_postings(company, skills, 1, title="Intern")
+        self.internship.job_type = JobPosting.JobTypeChoice.INTERNSHIP
+        self.internship.save()
+        for job_seeker in job_seekers:
+            JobApplication.objects.create(job_posting=self.full_time, job_seeker=job_seeker, cover_later="test", resume="resume.pdf")
+        JobApplication.objects.create(
+            job_posting=self.internship, job_seeker=job_seekers[0], cover_later="test", resume="resume.pdf",
+            status=JobApplication.StatusChoice.HIRED
+        )
+
+    def test_application_stats(self):
+        with self.assertNumQueries(2):
+            data = stats.application_stats()
+
+        self.assertEqual(data["total_applications"], 4)
+        self.assertEqual(data["applications_last_month"], 4)
+        self.assertEqual(data["average_application_per_job"], 4 / 3)
+        self.assertEqual(data["applications_by_job_type"], [
+            {"type": JobPosting.JobTypeChoice.FULL_TIME, "count": 3},
+            {"type": JobPosting.JobTypeChoice.INTERNSHIP, "count": 1},
+        ])
+        self.assertEqual(data["applications_by_status"], [
+            {"status": JobApplication.StatusChoice.UNDER_REVIEW, "count": 3},
+            {"status": JobApplication.StatusChoice.HIRED, "count": 1},
+        ])
+        self.assertEqual(data["most_applied_jobs"][0], {
+            "id": self.full_time.id, "title": self.full_time.title, "company": "Test", "applications_count": 3
+        })
+
+
+class SearchTestCase(APITestCase):
+    def setUp(self):
+        self.url = "/api/search/"
+        self.client = APIClient()
+        company = create_company()
+        skills = create_skills()
+        create_job_postings(company, skills, 3, title="Python developer")
+        create_job_postings(company, skills, 2, title="Accountant")
+
+    def test_full_text_search(self):
+        response = self.client.get(self.url, {"q": "developers", "limit": 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(len(data['job_postings']), 2)
+        self.assertTrue(data['has_more']['job_postings'])
+        self.assertTrue(all(post['title'].startswith("Python developer") for post in data['job_postings']))
+
+    def test_trigram_fallback(self):
+        response = self.client.get(self.url, {"q": "Acountant", "section": "job_postings"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(len(data['job_postings']), 2)
+        self.assertEqual(data['companies'], [])
+
+    def test_empty_query_is_paginated(self):
+        response = self.client.get(self.url, {"limit": 4}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['status'])
+        data = response.data['data']
+        self.assertEqual(len(data['job_postings']), 4)
+        self.assertTrue(data['has_more']['job_postings'])
+
+        response = self.client.get(self.url, {"limit": 4, "offset": 4}, format='json')
+        data = response.data['data']
+        self.assertEqual(len(data['job_postings']), 1)
+        self.assertFalse(data['has_more']['job_postings'])
@@ -16,5 +16,6 @@ urlpatterns = [
     path("saved-jobs/", views.SavedJobListAPIView.as_view(), name="saved_jobs"),
     path("saved-jobs/delete/<int:pk>/", views.SavedJobDestroyAPIView.as_view(), name="saved_jobs_update"),
     path("stats/job-postings/", views.JobPostingStatsListAPIView.as_view(), name="job_postings_stats"),
-    path("stats/applications/", views.JobApplicationStatsListAPIView.as_view(), name="job_applications_stats")
+    path("stats/applications/", views.JobApplicationStatsListAPIView.as_view(), name="job_applications_stats"),
+    path("search/", views.SearchAPIView.as_view(), name="search")
 ]
@@ -1,10 +1,9 @@
-from datetime import timedelta
 
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.db.models import Count, Q
+from django.db.models import Case, F, When
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
+from redis import RedisError
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.generics import (
     CreateAPIView,
@@ -19,22 +18,28 @@ from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.skills.models import Skill
 from apps.users.custom_response_decorator import custom_response
-from apps.users.models import Company, JobSeeker
+from apps.users.paginations import CursorPaginationMixin
 from apps.users.serializers import CompanySerializer, JobSeekerSerializer
 from apps.users.versioning import CustomHeaderVersioning
 
-from . import models, paginations, serializers, tasks
+from . import (
+    counters,
+    models,
+    paginations,
+    recently_viewed,
+    recommendations,
+    search,
+    serializers,
+    stats,
+    status_notifications,
+    tasks,
+)
 
 
 class CompanyActiveBasePermission(BasePermission):
     def has_object_permission(self, request, view, obj):
-        company = Company.objects.get(user=request.user)
-        if company is not None and company.is_active:
-            return True
-        else:
-            return False
+        return request.user.company_id is not None and request.user.company_is_active
 
 
 @custom_response("post_create")
@@ -57,10 +62,11 @@ class JobPostingCreateAPIView(CreateAPIView):
 
 
 @custom_response("posts_list")
-class JobPostingListAPIView(ListAPIView):
-    queryset = models.JobPosting.objects.all()
+class JobPostingListAPIView(CursorPaginationMixin, ListAPIView):
+    queryset = models.JobPosting.objects.with_related()
     serializer_class = serializers.JopPostingSerializer
     pagination_class = paginations.JobPostPageNumberPagination
+    cursor_pagination_class = paginations.JobPostCursorPagination
     versioning_class = CustomHeaderVersioning
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     ordering_fields = ['posted_date', 'deadline']
@@ -88,7 +94,7 @@ class JobPostingListAPIView(ListAPIView):
 
 @custom_response("post_detail")
 class JobPostingRetrieveAPIView(RetrieveAPIView):
-    queryset = models.JobPosting.objects.all()
+    queryset = models.JobPosting.objects.with_related()
     versioning_class = CustomHeaderVersioning
     serializer_class = serializers.JopPostingSerializer
 
@@ -97,15 +103,15 @@ class JobPostingRetrieveAPIView(RetrieveAPIView):
         version = self.request.version
         if version == '1.0':
             instance = self.get_object()
-            instance.views_count += 1
-            instance.save()
+            try:
+                instance.views_count += counters.increment_views(instance.id)
+            except RedisError:
+                models.JobPosting.objects.filter(id=instance.id).update(views_count=F("views_count") + 1)
+                instance.views_count += 1
 
             if request.user.is_authenticated:
-                viewed_jobs = request.session.get('viewed_jobs', [])
-                if instance.id not in viewed_jobs:
-                    viewed_jobs.append(instance.id)
-                    request.session['viewed_jobs'] = viewed_jobs
-                    request.session.save()
+                recently_viewed.add(request.user.id, instance.id)
+                recommendations.invalidate_user(request.user.id)
 
             post = self.serializer_class(instance).data
             return Response(post)
@@ -113,7 +119,7 @@ class JobPostingRetrieveAPIView(RetrieveAPIView):
 
 @custom_response("post_detail")
 class JobPostingRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView, UserPassesTestMixin):
-    queryset = models.JobPosting.objects.all()
+    queryset = models.JobPosting.objects.with_related()
     versioning_class = CustomHeaderVersioning
     serializer_class = serializers.JopPostingSerializer
     permission_classes = [IsAuthenticated]
@@ -122,7 +128,7 @@ class JobPostingRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView, UserP
         version = self.request.version
         if version == '1.0':
             post = self.get_object()
-            return post.company.user == self.request.user
+            return post.company_id == self.request.user.company_id
 
 
     def retrieve(self, request, *args, **kwargs):
@@ -153,14 +159,13 @@ class JobPostingRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView, UserP
 
 @custom_response("posts_recommended")
 class JobPostingRecommendedListAPIView(ListAPIView):
-    queryset = models.JobPosting.objects.all()
+    queryset = models.JobPosting.objects.with_related()
     serializer_class = serializers.JopPostingSerializer
     pagination_class = paginations.JobPostPageNumberPagination
     versioning_class = CustomHeaderVersioning
     filter_backends = [SearchFilter, DjangoFilterBackend, OrderingFilter]
     search_fields = ['title', 'company']
     ordering_fields = ['deadline', 'posted_date']
-    ordering = ['is_active']
     filterset_fields = [
         'company',
         'location',
@@ -178,36 +183,14 @@ class JobPostingRecommendedListAPIView(ListAPIView):
     def get_queryset(self):
         version = self.request.version
         if version == '1.0':
-            viewed_jobs_ids = self.request.session.get("viewed_jobs", [])
-
-            if not viewed_jobs_ids:
-                try:
-                    user = JobSeeker.objects.get(user=self.request.user)
-                    posts = models.JobPosting.objects.filter(skills_required__in=user.skills.all())
-                except JobSeeker.DoesNotExist:
-                    posts = models.JobPosting.objects.none()
-            else:
-                viewed_jobs = models.JobPosting.objects.filter(id__in=viewed_jobs_ids)
-
-                viewed_job_skills = set()
-                viewed_job_locations = set()
-                viewed_job_experiences = set()
-                viewed_job_education_required = set()
-
-                for job in viewed_jobs:
-                    viewed_job_skills.update(job.skills_required.all())
-                    viewed_job_locations.add(job.location)
-                    viewed_job_experiences.add(job.experience_level)
-                    viewed_job_education_required.add(job.education_required)
-
-                posts = models.JobPosting.objects.filter(
-                    Q(skills_required__in=viewed_job_skills) |
-                    Q(location__in=viewed_job_locations) |
-                    Q(experience_level__in=viewed_job_experiences) |
-                    Q(education_required__in=viewed_job_education_required)
-                ).distinct()
-
-            return posts
+            if not self.request.user.is_authenticated:
+                return self.queryset.none()
+
+            ids = recommendations.get_recommended_ids(self.request.user)
+            if not ids:
+                return self.queryset.none()
+            return self.queryset.filter(id__in=ids) \
+                .order_by(Case(*[When(id=post_id, then=position) for position, post_id in enumerate(ids)]))
 
 
     def get(self, request, *args, **kwargs):
@@ -217,12 +200,13 @@ class JobPostingRecommendedListAPIView(ListAPIView):
 
 
 @custom_response("job_application_list_and_post")
-class JobApplicationListCreateAPIView(ListCreateAPIView):
-    queryset = models.JobApplication.objects.all()
+class JobApplicationListCreateAPIView(CursorPaginationMixin, ListCreateAPIView):
+    queryset = models.JobApplication.objects.with_related()
     serializer_class = serializers.JobApplicationSerializer
     permission_classes = [IsAuthenticated]
     versioning_class = CustomHeaderVersioning
     pagination_class = paginations.JobPostPageNumberPagination
+    cursor_pagination_class = paginations.JobApplicationCursorPagination
     filter_backends = [SearchFilter, OrderingFilter, DjangoFilterBackend]
     search_fields = ['job_posting__title']
     ordering_fields = ['applied_date', 'updated_at']
@@ -230,6 +214,18 @@ class JobApplicationListCreateAPIView(ListCreateAPIView):
     filterset_fields = ['status', 'job_seeker__first_name']
 
 
+    def get_queryset(self):
+        if self.request.version == '2.0':
+            return models.JobApplication.objects.compact()
+        return super().get_queryset()
+
+
+    def get_serializer_class(self):
+        if self.request.version == '2.0':
+            return serializers.JobApplicationCompactSerializer
+        return self.serializer_class
+
+
     def create(self, request, *args, **kwargs):
         version = self.request.version
         if version == '1.0':
@@ -242,13 +238,13 @@ class JobApplicationListCreateAPIView(ListCreateAPIView):
 
     def get(self, request, *args, **kwargs):
         version = self.request.version
-        if version == '1.0':
+        if version in ('1.0', '2.0'):
             return self.list(request, *args, **kwargs)
 
 
 @custom_response("job_application_detail")
 class JobApplicationRetrieveAPIView(RetrieveAPIView):
-    queryset = models.JobApplication.objects.all()
+    queryset = models.JobApplication.objects.with_related()
     serializer_class = serializers.JobApplicationSerializer
     permission_classes = [IsAuthenticated]
     versioning_class = CustomHeaderVersioning
@@ -264,7 +260,7 @@ class JobApplicationRetrieveAPIView(RetrieveAPIView):
 
 @custom_response("my_application")
 class JobApplicationRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView, UserPassesTestMixin):
-    queryset = models.JobApplication.objects.all()
+    queryset = models.JobApplication.objects.with_related()
     serializer_class = serializers.JobApplicationSerializer
     permission_classes = [IsAuthenticated]
     versioning_class = CustomHeaderVersioning
@@ -298,7 +294,7 @@ class JobApplicationRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView, U
 
 @custom_response("my_application")
 class JobApplicationUpdateAPIView(UpdateAPIView, UserPassesTestMixin):
-    queryset = models.JobApplication.objects.all()
+    queryset = models.JobApplication.objects.with_related()
     serializer_class = serializers.JobApplicationSerializer
     permission_classes = [IsAuthenticated, CompanyActiveBasePermission]
     versioning_class = CustomHeaderVersioning
@@ -308,27 +304,20 @@ class JobApplicationUpdateAPIView(UpdateAPIView, UserPassesTestMixin):
         version = self.request.version
         if version == '1.0':
             job_application = self.get_object()
-            company = Company.objects.filter(user=self.request.user)
-            exist = company.filter(job_posts__in=job_application.job_posting)
-
-            if exist.exists():
-                return True
-            else:
-                return False
+            return job_application.job_posting.company_id == self.request.user.company_id
 
 
     def update(self, request, *args, **kwargs):
         version = self.request.version
         if version == '1.0':
-            serializer = self.serializer_class(self.get_object(), data=request.data, context={"request": request}, partial=True)
+            job_application = self.get_object()
+            previous_status = job_application.status
+            serializer = self.serializer_class(job_application, data=request.data, context={"request": request}, partial=True)
             if serializer.is_valid(raise_exception=True):
                 job_application = serializer.save()
 
-                tasks.update_status_application_notification.delay(
-                    request.user.id,
-                    job_application.id,
-                    job_application.job_posting.title
-                )
+                if job_application.status != previous_status:
+                    status_notifications.schedule(job_application.id)
 
                 return Response({
                     "id": job_application.id,
@@ -339,7 +328,7 @@ class JobApplicationUpdateAPIView(UpdateAPIView, UserPassesTestMixin):
 
 @custom_response("post_applications")
 class JobPostingApplicationListAPIView(ListAPIView):
-    queryset = models.JobApplication.objects.all()
+    queryset = models.JobApplication.objects.with_related()
     serializer_class = serializers.JobApplicationSerializer
     permission_classes = [IsAuthenticated]
     versioning_class = CustomHeaderVersioning
@@ -353,24 +342,32 @@ class JobPostingApplicationListAPIView(ListAPIView):
 
     def get_queryset(self):
         version = self.request.version
-        if version == '1.0':
+        if version in ('1.0', '2.0'):
             post = get_object_or_404(models.JobPosting, id=self.kwargs['pk'])
-            return models.JobApplication.objects.filter(job_posting=post)
+            queryset = models.JobApplication.objects.compact() if version == '2.0' else self.queryset
+            return queryset.filter(job_posting=post)
+
+
+    def get_serializer_class(self):
+        if self.request.version == '2.0':
+            return serializers.JobApplicationCompactSerializer
+        return self.serializer_class
 
 
     def get(self, request, *args, **kwargs):
         version = self.request.version
-        if version == '1.0':
+        if version in ('1.0', '2.0'):
             return self.list(request, *args, **kwargs)
 
 
 @custom_response("saved_job_list")
-class SavedJobListAPIView(ListCreateAPIView):
-    queryset = models.SavedJob.objects.all()
+class SavedJobListAPIView(CursorPaginationMixin, ListCreateAPIView):
+    queryset = models.SavedJob.objects.with_related()
     serializer_class = serializers.SavedJobSerializer
     permission_classes = [IsAuthenticated]
     versioning_class = CustomHeaderVersioning
     pagination_class = paginations.JobPostPageNumberPagination
+    cursor_pagination_class = paginations.SavedJobCursorPagination
     filter_backends = [SearchFilter, OrderingFilter]
     search_fields = ['job_posting__title']
     ordering_fields = ['saved_date']
@@ -379,8 +376,7 @@ class SavedJobListAPIView(ListCreateAPIView):
     def get_queryset(self):
         version = self.request.version
         if version == '1.0':
-            job_seeker = JobSeeker.objects.get(user=self.request.user)
-            return models.SavedJob.objects.filter(job_seeker=job_seeker)
+            return self.queryset.filter(job_seeker_id=self.request.user.profile_id)
 
 
     def get(self, request, *args, **kwargs):
@@ -411,8 +407,7 @@ class SavedJobDestroyAPIView(DestroyAPIView, UserPassesTestMixin):
         version = self.request.version
         if version == '1.0':
             job = self.get_object()
-            user = JobSeeker.objects.get(user=self.request.user)
-            return job.job_seeker == user
+            return job.job_seeker_id == self.request.user.profile_id
 
 
     def delete(self, request, *args, **kwargs):
@@ -433,42 +428,8 @@ class JobPostingStatsListAPIView(ListAPIView):
     def list(self, request, *args, **kwargs):
         version = self.request.version
         if version == '1.0':
-            posts = self.get_queryset()
-            today = timezone.now()
-            one_month_ago = today - timedelta(days=30)
-
-            active_posts = models.JobPosting.objects.filter(is_active=True)
-            expired_posts = models.JobPosting.objects.filter(deadline__lte=today)
-            new_job_postings_last_month = models.JobPosting.objects.filter(posted_date__gte=one_month_ago)
-
-            job_postings_by_type = models.JobPosting.objects.values("job_type") \
-                .annotate(count=Count("job_type")) \
-                .order_by("-count")
-
-            job_posting_by_experience_level = models.JobPosting.objects.values("experience_level") \
-                .annotate(count=Count("experience_level")) \
-                .order_by("-count")
-
-            job_postings_by_location = models.JobPosting.objects.values("location") \
-                .annotate(count=Count("location")) \
-                .order_by("-count")
-
-            most_demanded_skills = Skill.objects \
-                .annotate(count=Count("job_posts")) \
-                .order_by("-count")
-
-            response_data = {
-                "total_job_postings": posts.count(),
-                "active_job_postings": active_posts.count(),
-                "expired_job_postings": expired_posts.count(),
-                "new_job_postings_last_month": new_job_postings_last_month.count(),
-                "job_postings_by_type": [{"type": post['job_type'], "count": post['count']} for post in job_postings_by_type],
-                "job_posting_by_experience_level": [{"level": post['experience_level'], "count": post['count']} for post in job_posting_by_experience_level],
-                "job_postings_by_location": [{"location": post["location"], "count": post["count"]} for post in job_postings_by_location],
-                "most_demanded_skills": [{"skill": skill.name, "count": skill.count} for skill in most_demanded_skills]
-            }
-
-            return Response(response_data)
+            live = request.query_params.get("live") == "1" and request.user.is_staff
+            return Response(stats.get_stats(models.StatsSnapshot.NameChoice.JOB_POSTINGS, live=live))
 
 
 @custom_response("job_application_stats")
@@ -481,72 +442,45 @@ class JobApplicationStatsListAPIView(ListAPIView):
     def list(self, request, *args, **kwargs):
         version = self.request.version
         if version == '1.0':
-            applications = self.get_queryset()
-            today = timezone.now()
-            one_month_ago = today - timedelta(days=30)
-
-            applications_last_month = models.JobApplication.objects.filter(applied_date__gte=one_month_ago)
-            applications_by_status = models.JobApplication.objects.values("status") \
-                .annotate(count=Count("status")) \
-                .order_by("-count")
-
-            applications_by_job_type = models.JobPosting.objects \
-                .annotate(count=Count("job_applications")) \
-                .order_by("-count")
-
-            total_job_postings = models.JobPosting.objects.count()
-            average_application_per_job = applications.count() / total_job_postings if total_job_postings > 0 else 0
-
-            most_applied_jobs = models.JobPosting.objects.annotate(
-                num_applications=Count('job_applications')
-            ).order_by('-num_applications')[:10]
-
-            response_data = {
-                "total_applications": applications.count(),
-                "applications_last_month": applications_last_month.count(),
-                "applications_by_status": [{"status": application['status'], "count": application['count']} for application in applications_by_status],
-                "applications_by_job_type": [{"type": post.job_type, "count": post.count} for post in applications_by_job_type],
-                "average_application_per_job": average_application_per_job,
-                "most_applied_jobs": [{"id": job.id, "title": job.title, "company": job.company.name, "applications_count": job.num_applications} for job in most_applied_jobs]
-            }
-
-            return Response(response_data)
+            live = request.query_params.get("live") == "1" and request.user.is_staff
+            return Response(stats.get_stats(models.StatsSnapshot.NameChoice.APPLICATIONS, live=live))
 
 
 @custom_response("search")
 class SearchAPIView(APIView):
-    queryset = models.JobPosting.objects.all()
+    queryset = models.JobPosting.objects.with_related()
+    versioning_class = CustomHeaderVersioning
+    pagination_class = paginations.SearchLimitOffsetPagination
+    sections = {
+        "job_postings": (search.search_job_postings, serializers.JopPostingSerializer),
+        "companies": (search.search_companies, CompanySerializer),
+        "profiles": (search.search_profiles, JobSeekerSerializer),
+    }
 
     def get(self, request, *args, **kwargs):
         search_query = request.GET.get('q', None)
+        paginator = self.pagination_class()
 
         if not search_query:
-            posts = self.queryset
-            posts_data = serializers.JopPostingSerializer(posts, many=True).data
+            posts, has_more = paginator.paginate_section(self.queryset.order_by('-posted_date', '-id'), request)
             return Response({
-                "job_postings": posts_data,
+                "job_postings": serializers.JopPostingSerializer(posts, many=True).data,
                 "companies": [],
-                "profiles": []
+                "profiles": [],
+                "has_more": {"job_postings": has_more, "companies": False, "profiles": False}
             })
 
-        posts = self.queryset.filter(title__icontains=search_query)
-
-        companies = Company.objects.filter(
-            Q(name__icontains=search_query) | Q(industry__icontains=search_query)
-        )
+        section = request.GET.get('section', None)
+        response_data = {"has_more": {}}
 
-        profiles = JobSeeker.objects.filter(
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(phone_number__icontains=search_query)
-        )
+        for name, (search_section, serializer_class) in self.sections.items():
+            if section and section != name:
+                response_data[name] = []
+                response_data["has_more"][name] = False
+                continue
 
-        posts_data = serializers.JopPostingSerializer(posts, many=True).data
-        companies_data = CompanySerializer(companies, many=True).data
-        profiles_data = JobSeekerSerializer(profiles, many=True).data
+            results, has_more = paginator.paginate_section(search_section(search_query), request)
+            response_data[name] = serializer_class(results, many=True).data
+            response_data["has_more"][name] = has_more
 
-        return Response({
-            "job_postings": posts_data,
-            "companies": companies_data,
-            "profiles": profiles_data
-        })
+        return Response(response_data)
@@ -6,7 +6,7 @@ from django.contrib.auth.forms import (
     UserCreationForm,
 )
 
-from .models import Company, JobSeeker, Token, User
+from .models import Company, JobSeeker, OutgoingEmail, Token, User
 
 
 class CustomUserCreationForm(UserCreationForm):
@@ -78,3 +78,10 @@ class CompanyAdmin(admin.ModelAdmin):
     list_display = ('id', 'name', 'industry', 'location', 'founded_year', 'employees_count', 'is_active')
     list_filter = ('location', 'industry', 'founded_year', 'employees_count', 'is_active', 'created_at', 'updated_at')
     search_fields = ('id', 'name', 'industry')
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'to', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'created_at', 'sent_at')
+    search_fields = ('to', 'subject', 'last_error')
@@ -0,0 +1,89 @@
+import json
+import logging
+from datetime import datetime
+
+from django.conf import settings
+from django.db import router
+from django.db.models import F
+from django.utils.translation import gettext_lazy as _
+from redis import RedisError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from config.redis import redis_client
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+USER_KEY = "users:auth:{user_id}"
+# The password hash is never cached, the instance loads it from the DB if something reads it.
+FIELDS = [field for field in User._meta.concrete_fields if field.attname != "password"]
+ROLES = ("profile_id", "company_id", "company_is_active")
+
+
+def load(user_id):
+    """
+    Returns the cached fields and roles of the user, loading them with one query and caching them on a miss.
+    """
+    key = USER_KEY.format(user_id=user_id)
+    try:
+        cached = redis_client.get(key)
+    except RedisError as e:
+        logger.warning(f"Authenticated user could not be read from the cache: {e}")
+        cached = None
+    if cached is not None:
+        return json.loads(cached)
+
+    data = User.objects.filter(id=user_id).values(
+        *[field.attname for field in FIELDS],
+        profile_id=F("profile__id"),
+        company_id=F("company__id"),
+        company_is_active=F("company__is_active"),
+    ).first()
+    if data is None:
+        return None
+    try:
+        redis_client.set(key, json.dumps(data, default=datetime.isoformat), ex=settings.AUTH_USER_CACHE_TTL)
+    except RedisError as e:
+        logger.warning(f"Authenticated user could not be cached: {e}")
+    return data
+
+
+def invalidate(*user_ids):
+    try:
+        redis_client.delete(*[USER_KEY.format(user_id=user_id) for user_id in user_ids])
+    except RedisError as e:
+        logger.warning(f"Authenticated user cache could not be invalidated: {e}")
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Resolves the token's user, with their job seeker profile id and company id, from a short-lived cache,
+    so an authenticated request needs no query for them.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        data = load(user_id)
+        if data is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        user = User.from_db(
+            router.db_for_read(User),
+            [field.attname for field in FIELDS],
+            [field.to_python(data[field.attname]) for field in FIELDS],
+        )
+        user.roles = {role: data[role] for role in ROLES}
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -1,28 +1,31 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+
+
+def get_user_by_login(username_or_email):
+    """
+    Finds the user by username or email with one query on the two unique indexes.
+    A username match wins when the value is one user's username and another user's email.
+    """
+    UserModel = get_user_model()
+    if not username_or_email:
+        return None
+    users = list(UserModel.objects.filter(Q(username=username_or_email) | Q(email=username_or_email))[:2])
+    return next((user for user in users if user.username == username_or_email), users[0] if users else None)
 
 
 class UsernameOrEmailBackend(ModelBackend):
     def authenticate(self, request, username_or_email=None, password=None, **kwargs):
         UserModel = get_user_model()
+        username_or_email = username_or_email or kwargs.get(UserModel.USERNAME_FIELD) or kwargs.get("username")
 
-        user = None
+        user = get_user_by_login(username_or_email)
+        if user is None:
+            # Hash the password anyway, so an unknown login takes as long as a wrong password.
+            UserModel().set_password(password)
+            return None
 
-        try:
-            if username_or_email:
-                user = UserModel.objects.get(username=username_or_email)
-        except UserModel.DoesNotExist:
-            try:
-                user = UserModel.objects.get(email=username_or_email)
-            except UserModel.DoesNotExist:
-                return None
-
-        if user:
-            if user.check_password(password):
-                if user.is_active:
-                    return user
-                else:
-                    return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
         return None
-
-
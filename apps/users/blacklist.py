@@ -0,0 +1,150 @@
+import logging
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from redis import RedisError
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from config.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+BLACKLIST_KEY = "users:blacklist"
+# Kept inside the sorted set, so if Redis loses the set it loses the marker too and checks fall back to the DB.
+SYNCED_MEMBER = "synced"
+# Bumped by every sync and unmark, a sync sets the marker only if nothing bumped it while the set was being loaded.
+GENERATION_KEY = "users:blacklist:generation"
+
+_MARK_IF_UNCHANGED = redis_client.register_script("""
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('ZADD', KEYS[1], '+inf', ARGV[2])
+return 1
+""")
+
+
+def add(jti, exp):
+    """
+    Adds the jti to the set. If that fails the set is no longer complete, so it is marked as such and checks go to
+    the DB until the next flush reloads it.
+    """
+    try:
+        redis_client.zadd(BLACKLIST_KEY, {jti: exp})
+    except RedisError as e:
+        logger.warning(f"Token {jti} could not be added to the blacklist cache: {e}")
+        unmark()
+
+
+def unmark():
+    try:
+        pipeline = redis_client.pipeline()
+        pipeline.incr(GENERATION_KEY)
+        pipeline.zrem(BLACKLIST_KEY, SYNCED_MEMBER)
+        pipeline.execute()
+    except RedisError as e:
+        logger.error(f"Blacklist cache could not be marked as incomplete: {e}")
+
+
+def is_blacklisted(jti):
+    """
+    Answers from the Redis set of blacklisted jtis once it holds the whole blacklist, and from the DB until then.
+    """
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.zscore(BLACKLIST_KEY, jti)
+        pipeline.zscore(BLACKLIST_KEY, SYNCED_MEMBER)
+        score, synced = pipeline.execute()
+    except RedisError as e:
+        logger.warning(f"Blacklist cache could not be read: {e}")
+        score, synced = None, None
+
+    if score is not None:
+        return True
+    if synced is not None:
+        return False
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def sync(batch_size):
+    """
+    Loads the unexpired blacklisted jtis into Redis and marks the set as complete, unless it was unmarked meanwhile.
+    Returns whether the marker was set.
+    """
+    generation = redis_client.incr(GENERATION_KEY)
+    rows = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()) \
+        .values_list("token__jti", "token__expires_at").order_by().iterator(chunk_size=batch_size)
+    pipeline = redis_client.pipeline(transaction=False)
+    for count, (jti, expires_at) in enumerate(rows, 1):
+        pipeline.zadd(BLACKLIST_KEY, {jti: expires_at.timestamp()})
+        if count % batch_size == 0:
+            pipeline.execute()
+    pipeline.execute()
+    if not _MARK_IF_UNCHANGED(keys=[BLACKLIST_KEY, GENERATION_KEY], args=[generation, SYNCED_MEMBER]):
+        logger.warning("Blacklist cache changed while it was being loaded, it is left unmarked until the next flush.")
+        return False
+    return True
+
+
+def size():
+    try:
+        return max(redis_client.zcard(BLACKLIST_KEY) - 1, 0)
+    except RedisError as e:
+        logger.warning(f"Blacklist cache size could not be read: {e}")
+        return None
+
+
+def flush_expired():
+    """
+    Deletes expired outstanding tokens, with their blacklist entries, in batches of TOKEN_BLACKLIST_FLUSH_BATCH_SIZE,
+    trims the Redis set and loads it from the DB when it is not complete. Returns the run's metrics.
+    """
+    batch_size = settings.TOKEN_BLACKLIST_FLUSH_BATCH_SIZE
+    now = timezone.now()
+    started = time.perf_counter()
+
+    deleted = 0
+    for batch in range(settings.TOKEN_BLACKLIST_FLUSH_MAX_BATCHES):
+        ids = list(OutstandingToken.objects.filter(expires_at__lte=now).order_by().values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    try:
+        redis_client.zremrangebyscore(BLACKLIST_KEY, "-inf", now.timestamp())
+        if redis_client.zscore(BLACKLIST_KEY, SYNCED_MEMBER) is None:
+            sync(batch_size)
+    except RedisError as e:
+        logger.warning(f"Blacklist cache could not be flushed: {e}")
+
+    metrics = {
+        "outstanding_deleted": deleted,
+        "outstanding": OutstandingToken.objects.count(),
+        "blacklisted": size(),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info(f"Token blacklist flush: {metrics}.")
+    return metrics
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    Checks the blacklist through the Redis set. Tokens are added to the set by the BlacklistedToken post_save
+    receiver, however they are blacklisted.
+    """
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
@@ -39,6 +39,10 @@ codes = {
     "notifications_list": "Bildirishnomalar ro'yxati muvaffaqiyatli olindi.",
     "notification_status_read": "Bildirishnoma o'qilgan deb belgilandi.",
     "notifications_status_read": "Barcha bildirishnomalar o'qilgan deb belgilandi.",
+    "notifications_unread_count": "O'qilmagan bildirishnomalar soni olindi.",
+    "subscriptions": "Obunalar muvaffaqiyatli olindi.",
+    "subscription_create": "Obuna muvaffaqiyatli yaratildi.",
+    "subscription_delete": "Obuna muvaffaqiyatli bekor qilindi.",
     "post_create": "Vakansiya muvaffaqiyatli e'lon qilindi.",
     "posts_list": "Vakansiyalar ro'yxati muvaffaqiyatli olindi.",
     "post_detail": "Vakansiya ma'lumotlari muvaffaqiyatli olindi.",
@@ -121,6 +125,12 @@ def custom_response(mark):
                     data['message'] = codes['notification_status_read']
                 elif mark == "notifications_status_read":
                     data['message'] = codes['notifications_status_read']
+                elif mark == "notifications_unread_count":
+                    data['message'] = codes['notifications_unread_count']
+                elif mark == "subscriptions":
+                    data['message'] = (codes['subscriptions'] if request.method == 'GET' else codes['subscription_create'])
+                elif mark == "subscription_delete":
+                    data['message'] = codes['subscription_delete']
                 elif mark == "posts_list":
                     data['message'] = codes['posts_list']
                 elif mark == "post_detail":
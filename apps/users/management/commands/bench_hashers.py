@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = "Reports password verifications per second on one core for every hasher, to size the login fleet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=3.0, help="Time spent on each hasher.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"preferred hasher: {settings.PASSWORD_HASHER}")
+        for name, path in settings.PASSWORD_HASHER_CLASSES.items():
+            hasher = import_string(path)()
+            try:
+                encoded = hasher.encode("bench-password", hasher.salt())
+            except ValueError as e:
+                self.stdout.write(f"{name:<8} unavailable: {e}")
+                continue
+
+            count = 0
+            started = time.perf_counter()
+            while time.perf_counter() - started < options["seconds"]:
+                hasher.verify("bench-password", encoded)
+                count += 1
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{name:<8} {count / elapsed:8.1f} hashes/s per core ({elapsed / count * 1000:.1f}ms each)")
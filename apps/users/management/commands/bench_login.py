@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.users.models import User
+from apps.users.serializers import CustomTokenObtainSerializer
+
+
+class Command(BaseCommand):
+    help = "Measures login throughput of the single-lookup login against the old triple authentication and deletes the seeded user."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=20)
+        parser.add_argument("--by", choices=["username", "email"], default="email")
+
+    def handle(self, *args, **options):
+        password = "bench-login-password"
+        user = User.objects.create_user(
+            username="bench_login", email="bench_login@example.com", password=password, is_active=True
+        )
+        login = user.username if options["by"] == "username" else user.email
+        request = APIRequestFactory().post("/api/auth/login/")
+
+        def lookup():
+            try:
+                return User.objects.get(username=login)
+            except User.DoesNotExist:
+                return User.objects.get(email=login)
+
+        def legacy():
+            # The serializer, UsernameOrEmailBackend and TokenObtainPairSerializer each looked the user up and hashed the password.
+            for _ in range(3):
+                lookup().check_password(password)
+            RefreshToken.for_user(user)
+
+        def single():
+            serializer = CustomTokenObtainSerializer(data={"email": login, "password": password}, context={"request": request})
+            serializer.is_valid(raise_exception=True)
+
+        try:
+            for name, func in (("legacy login:", legacy), ("single lookup:", single)):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for _ in range(options["logins"]):
+                        func()
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{name:<15} {options['logins'] / elapsed:.1f} logins/s "
+                    f"({elapsed / options['logins'] * 1000:.0f}ms, {len(queries) / options['logins']:.0f} queries each)"
+                )
+        finally:
+            user.delete()
@@ -0,0 +1,74 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.utils import timezone
+
+from apps.users import token_service
+from apps.users.models import Token, User
+
+
+class Command(BaseCommand):
+    help = "Seeds users with verification tokens, measures token verify throughput and deletes the seeded rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--verifications", type=int, default=5000)
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded rows.")
+
+    def handle(self, *args, **options):
+        users = self.seed(options["users"], options["batch_size"])
+        count = options["verifications"]
+
+        try:
+            tokens = dict(Token.objects.filter(user__username__startswith="bench_tokens").values_list("user_id", "token"))
+            sample = random.choices(users, k=count)
+
+            def legacy():
+                for user in sample:
+                    User.objects.get(id=user.id)
+                    Token.objects.get(token=tokens[user.id])
+
+            def joined():
+                for user in sample:
+                    token_service.verify(user.id, tokens[user.id], token_service.VERIFY_EMAIL)
+
+            with override_settings(VERIFICATION_TOKEN_SIGNED=True):
+                signed_tokens = {user.id: token_service.issue(user, token_service.VERIFY_EMAIL) for user in set(sample)}
+
+                def signed():
+                    for user in sample:
+                        token_service.verify(user.id, signed_tokens[user.id], token_service.VERIFY_EMAIL)
+
+                self.report("signed token:", signed, count)
+            self.report("legacy lookups:", legacy, count)
+            self.report("joined lookup:", joined, count)
+        finally:
+            if not options["keep"]:
+                User.objects.filter(username__startswith="bench_tokens").delete()
+
+    def report(self, name, func, count):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{name:<16} {count / elapsed:,.0f} verifications/s ({elapsed / count * 1000:.3f}ms each)")
+
+    def seed(self, count, batch_size):
+        started = time.perf_counter()
+        users = []
+        expires_at = timezone.now() + timedelta(days=1)
+        for offset in range(0, count, batch_size):
+            batch = User.objects.bulk_create([
+                User(username=f"bench_tokens_{i}", email=f"bench_tokens_{i}@example.com", password="!")
+                for i in range(offset, min(offset + batch_size, count))
+            ])
+            Token.objects.bulk_create([
+                Token(user=user, token=f"bench-{user.id}-{random.getrandbits(64):x}", purpose=token_service.VERIFY_EMAIL,
+                      expires_at=expires_at) for user in batch
+            ])
+            users += batch
+        self.stdout.write(f"Seeded {count} users with tokens in {time.perf_counter() - started:.1f}s.")
+        return users
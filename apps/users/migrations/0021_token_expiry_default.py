@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:51
+
+import apps.users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0020_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='token',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True, default=apps.users.models.default_token_expiry),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0021_token_expiry_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='token',
+            name='purpose',
+            field=models.CharField(blank=True, choices=[('verify_email', 'Verify email'), ('recover_password', 'Recover password')], max_length=20),
+        ),
+    ]
@@ -1,10 +1,14 @@
 import uuid
-from datetime import timedelta
 
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser, PermissionsMixin
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.core.exceptions import ObjectDoesNotExist
 from django.core.validators import RegexValidator
 from django.db import models
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 from apps.skills.models import Skill
@@ -38,6 +42,51 @@ class User(AbstractUser, PermissionsMixin):
     def __str__(self):
         return self.username
 
+    @cached_property
+    def roles(self):
+        """
+        The ids of the user's job seeker profile and company, loaded with one query unless the authentication set them.
+        """
+        return User.objects.filter(id=self.id).values(
+            profile_id=models.F("profile__id"),
+            company_id=models.F("company__id"),
+            company_is_active=models.F("company__is_active"),
+        ).first() or {"profile_id": None, "company_id": None, "company_is_active": None}
+
+    @property
+    def profile_id(self):
+        return self.roles["profile_id"]
+
+    @property
+    def company_id(self):
+        return self.roles["company_id"]
+
+    @property
+    def company_is_active(self):
+        return bool(self.roles["company_is_active"])
+
+    def get_profile(self):
+        """
+        The user's job seeker profile or None. It is loaded once per instance, so the permissions, views and
+        serializers of a request share it, and not at all when the roles say the user has none.
+        """
+        return self._get_role("profile", self.profile_id)
+
+    def get_company(self):
+        """
+        The user's company or None, loaded like get_profile().
+        """
+        return self._get_role("company", self.company_id)
+
+    def _get_role(self, accessor, role_id):
+        if role_id is None:
+            return None
+        try:
+            # The reverse one-to-one accessor caches the object, or its absence, on the instance.
+            return getattr(self, accessor)
+        except ObjectDoesNotExist:
+            return None
+
 
 class JobSeeker(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
@@ -55,7 +104,18 @@ class JobSeeker(models.Model):
     education_level = models.CharField(max_length=255)
     resume = models.FileField(upload_to="job_seeker_resumes/", blank=True, null=True)
     profile_photo = models.ImageField(upload_to="job_seeker_photos/", null=True)
+    search_vector = models.GeneratedField(
+        expression=SearchVector("first_name", "last_name", config="simple"),
+        output_field=SearchVectorField(),
+        db_persist=True
+    )
 
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="jobseeker_search_vector_idx"),
+            GinIndex(fields=["first_name"], name="jobseeker_first_name_trgm_idx", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["last_name"], name="jobseeker_last_name_trgm_idx", opclasses=["gin_trgm_ops"]),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -74,16 +134,37 @@ class Company(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=False)
+    search_vector = models.GeneratedField(
+        expression=SearchVector("name", weight="A", config="simple")
+        + SearchVector("industry", weight="B", config="simple"),
+        output_field=SearchVectorField(),
+        db_persist=True
+    )
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="company_search_vector_idx"),
+            GinIndex(fields=["name"], name="company_name_trgm_idx", opclasses=["gin_trgm_ops"]),
+        ]
 
 
     def __str__(self):
         return f"Username:{self.user.username}, Name:{self.name}"
 
 
+def default_token_expiry():
+    return timezone.now() + settings.VERIFICATION_TOKEN_LIFETIME
+
+
 class Token(models.Model):
+    class PurposeChoice(models.TextChoices):
+        VERIFY_EMAIL = "verify_email", _("Verify email")
+        RECOVER_PASSWORD = "recover_password", _("Recover password")
+
     token = models.CharField(max_length=50, unique=True, blank=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tokens")
-    expires_at = models.DateTimeField(default=timezone.now() + timedelta(seconds=200))
+    purpose = models.CharField(max_length=20, choices=PurposeChoice.choices, blank=True)
+    expires_at = models.DateTimeField(default=default_token_expiry, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -91,3 +172,29 @@ class Token(models.Model):
         if not self.token:
             self.token = str(uuid.uuid4())
         super().save(*args, **kwargs)
+
+
+class OutgoingEmail(models.Model):
+    class StatusChoice(models.TextChoices):
+        PENDING = "Pending", _("Pending")
+        SENT = "Sent", _("Sent")
+        FAILED = "Failed", _("Failed")
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.EmailField()
+    status = models.CharField(max_length=10, choices=StatusChoice.choices, default=StatusChoice.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outgoingemail_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.to}: {self.subject}"
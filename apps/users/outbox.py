@@ -0,0 +1,163 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from redis import RedisError
+
+from config.redis import redis_client
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+SCHEDULED_KEY = "users:outbox:scheduled"
+RATE_KEY = "users:outbox:rate:{provider}:{window}"
+RATE_WINDOW = 60
+
+
+def enqueue(subject, body, to, from_email=None):
+    """
+    Saves the email to the outbox and makes sure a drain is scheduled once the transaction commits.
+    """
+    email = OutgoingEmail.objects.create(
+        subject=subject, body=body, to=to, from_email=from_email or settings.EMAIL_HOST_USER
+    )
+    transaction.on_commit(schedule_drain)
+    return email
+
+
+def schedule_drain():
+    from .tasks import send_queued_emails
+
+    try:
+        scheduled = redis_client.set(SCHEDULED_KEY, 1, nx=True, ex=RATE_WINDOW)
+    except RedisError as e:
+        logger.warning(f"Email outbox drain could not be deduplicated: {e}")
+        scheduled = True
+    if scheduled:
+        send_queued_emails.delay()
+
+
+def provider():
+    return settings.EMAIL_HOST if settings.EMAIL_BACKEND.endswith("smtp.EmailBackend") else settings.EMAIL_BACKEND
+
+
+def reserve(count):
+    """
+    Takes up to `count` sends from the provider's per-minute allowance and returns how many were granted.
+    """
+    limit = settings.EMAIL_OUTBOX_RATE_LIMIT
+    if not limit:
+        return count
+    key = RATE_KEY.format(provider=provider(), window=int(time.time()) // RATE_WINDOW)
+    try:
+        pipeline = redis_client.pipeline()
+        pipeline.incrby(key, count)
+        pipeline.expire(key, RATE_WINDOW * 2)
+        used, _ = pipeline.execute()
+    except RedisError as e:
+        logger.warning(f"Email rate limit could not be checked: {e}")
+        return count
+    granted = max(0, min(count, limit - (used - count)))
+    if granted < count:
+        try:
+            redis_client.decrby(key, count - granted)
+        except RedisError as e:
+            logger.warning(f"Email rate limit could not be released: {e}")
+    return granted
+
+
+def claim(batch_size, now):
+    """
+    Leases a batch of due emails to this drain by moving their next attempt past EMAIL_OUTBOX_LEASE, in a short
+    transaction that skips rows another drain is claiming. If the drain dies, the emails become due again.
+    """
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutgoingEmail.StatusChoice.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        emails = emails[:reserve(len(emails))]
+        if emails:
+            OutgoingEmail.objects.filter(id__in=[email.id for email in emails]) \
+                .update(next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE))
+    return emails
+
+
+def send_batch(connection, batch_size):
+    """
+    Sends one batch of due emails over the open connection and returns (sent, failed).
+    No transaction is open while the provider is talked to, the results are saved afterwards.
+    """
+    now = timezone.now()
+    emails = claim(batch_size, now)
+    if not emails:
+        return 0, 0
+
+    sent, failed = [], []
+    for email in emails:
+        message = EmailMessage(email.subject, email.body, email.from_email, [email.to], connection=connection)
+        try:
+            connection.send_messages([message])
+        except Exception as e:
+            email.attempts += 1
+            email.last_error = str(e)
+            if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                email.status = OutgoingEmail.StatusChoice.FAILED
+            else:
+                email.next_attempt_at = now + timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (email.attempts - 1))
+            failed.append(email)
+        else:
+            email.attempts += 1
+            email.status = OutgoingEmail.StatusChoice.SENT
+            email.sent_at = timezone.now()
+            sent.append(email)
+
+    OutgoingEmail.objects.bulk_update(sent + failed, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"])
+    return len(sent), len(failed)
+
+
+def drain(batch_size=None, max_batches=None):
+    """
+    Sends the due outbox emails in batches over a single connection and returns the number sent and failed.
+    A failed email is retried with exponential backoff until EMAIL_OUTBOX_MAX_ATTEMPTS, then marked as failed.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_batches = max_batches or settings.EMAIL_OUTBOX_MAX_BATCHES
+    try:
+        redis_client.delete(SCHEDULED_KEY)
+    except RedisError as e:
+        logger.warning(f"Email outbox drain could not be released: {e}")
+
+    started = time.perf_counter()
+    total_sent = total_failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for _ in range(max_batches):
+            sent, failed = send_batch(connection, batch_size)
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < batch_size:
+                break
+    finally:
+        connection.close()
+
+    if total_sent or total_failed:
+        logger.info(f"Email outbox: {total_sent} sent, {total_failed} failed in {time.perf_counter() - started:.2f}s.")
+    return {"sent": total_sent, "failed": total_failed}
+
+
+def queue_verify_email(email, full_link):
+    message = f"Sizning emailgiz Job Connect saytida ro'yxatdan o'tdi.\nEmail sizga tegishligini tasdiqlash uchun ushbu link orqali saytga o'tsangiz bo'ladi: {full_link}"
+    return enqueue("Job Connect saytidan xabar!", message, email)
+
+
+def queue_password_reset_email(email, full_link):
+    message = f"Yangi password kiritish uchun shu link bo'yicha o'ting: {full_link}."
+    return enqueue("Job Connect dan xabar!", message, email)
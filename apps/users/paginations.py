@@ -1,6 +1,34 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class CompanyPageNumberPagination(PageNumberPagination):
     page_size = 10
     max_page_size = 100
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination that always pages over its own (date, id) keyset.
+    The view's OrderingFilter is ignored so `?ordering=` can't break the cursor.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+
+class CursorPaginationMixin:
+    """
+    Lets a list view switch from page numbers to keyset pagination with `?pagination=cursor`.
+    """
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.cursor_pagination_class is not None and self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = self.cursor_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
@@ -1,15 +1,20 @@
-from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
 from django.core.validators import FileExtensionValidator, RegexValidator
 from django.db import transaction
-from django.utils import timezone
 from rest_framework import serializers
 from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
 
 from apps.users.models import JobSeeker
 
-from . import models
+from . import models, token_service
+from .backends import get_user_by_login
+from .blacklist import RefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -33,18 +38,19 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class CustomTokenObtainSerializer(TokenObtainPairSerializer):
+    token_class = RefreshToken
+
     def validate(self, attrs):
+        """
+        Logs in with one user lookup and one password hash, instead of authenticating again in super().validate().
+        """
         username_or_email = attrs.get(self.username_field)
         password = attrs.get('password')
-        User = get_user_model()
 
-        try:
-            user = User.objects.get(username=username_or_email)
-        except User.DoesNotExist:
-            try:
-                user = User.objects.get(email=username_or_email)
-            except User.DoesNotExist:
-                raise serializers.ValidationError({"error": 'No user found with the provided credentials'})
+        user = get_user_by_login(username_or_email)
+        if user is None:
+            get_user_model()().set_password(password)
+            raise serializers.ValidationError({"error": 'No active account found with the given credentials'})
 
         if not user.check_password(password):
             raise serializers.ValidationError({"error": 'No active account found with the given credentials'})
@@ -52,24 +58,18 @@ class CustomTokenObtainSerializer(TokenObtainPairSerializer):
         if not user.is_active:
             raise serializers.ValidationError({"error": 'User account is not active'})
 
-        authenticate_kwargs = {
-            self.username_field: username_or_email,
-            'password': password
-        }
+        self.user = user
+        refresh = self.get_token(user)
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
+        return {"refresh": str(refresh), "access": str(refresh.access_token)}
 
-        request = self.context.get('request')
-        if request:
-            authenticate_kwargs['request'] = request
-        else:
-            raise serializers.ValidationError({"error": 'Request context missing'})
-
-        user = authenticate(**authenticate_kwargs)
-
-        if user is None:
-            raise serializers.ValidationError({"error": 'No active account found with the given credentials'})
 
-        data = super().validate(attrs)
-        return data
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Checks and blacklists rotated refresh tokens through the Redis blacklist set.
+    """
+    token_class = RefreshToken
 
 
 class JobSeekerSerializer(serializers.ModelSerializer):
@@ -100,7 +100,7 @@ class JobSeekerSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         skills_data = validated_data.pop("skills", [])
-        if models.JobSeeker.objects.filter(user=self.context['request'].user).exists():
+        if self.context['request'].user.profile_id is not None:
             raise serializers.ValidationError({"error": "You have a profile, you can't create a second profile."})
         job_seeker = models.JobSeeker.objects.create(user=self.context['request'].user, **validated_data)
         job_seeker.skills.set(skills_data)
@@ -161,31 +161,27 @@ class VerifyEmailSerializer(serializers.Serializer):
     token = serializers.CharField()
 
     def validate(self, attrs):
-        pk = attrs['pk']
-        token = attrs['token']
-
         try:
-            user = models.User.objects.get(id=pk)
-            token = models.Token.objects.get(token=token)
-
-        except models.User.DoesNotExist:
-            raise serializers.ValidationError({"error": "The user ID is wrong"})
+            user, token = token_service.verify(attrs['pk'], attrs['token'], token_service.VERIFY_EMAIL)
 
-        except models.Token.DoesNotExist:
-            raise serializers.ValidationError({"error": "The token is wrong"})
+        except token_service.InvalidToken:
+            raise serializers.ValidationError({"error": "The user ID or token is wrong"})
 
-        if token.expires_at <= timezone.now() and not user.is_verify_email:
+        except token_service.ExpiredToken as e:
+            if e.user.is_verify_email:
+                token_service.consume(e.token)
+                raise serializers.ValidationError({"error": "Token vaqti o'tib ketdi."})
             with transaction.atomic():
-                token.delete()
-                user.delete()
+                token_service.consume(e.token)
+                e.user.delete()
             raise serializers.ValidationError(
-                {"error": f"Token vaqti o'tib ketdi shu sababli {user.username} o'chirib tashlandi."}
+                {"error": f"Token vaqti o'tib ketdi shu sababli {e.user.username} o'chirib tashlandi."}
             )
 
         user.is_active = True
         user.is_verify_email = True
-        user.save()
-        token.delete()
+        user.save(update_fields=["is_active", "is_verify_email", "updated_at"])
+        token_service.consume(token)
         attrs['user'] = UserSerializer(user).data
         return attrs
 
@@ -208,33 +204,27 @@ class ForgotPasswordSerializer(serializers.Serializer):
         return attrs
 
 
-class RecoveryPasswordGetSerializer(serializers.Serializer):
-    pk = serializers.IntegerField()
-    token = serializers.CharField()
+def verify_recovery_token(pk, token):
+    try:
+        return token_service.verify(pk, token, token_service.RECOVER_PASSWORD)
 
+    except token_service.InvalidToken:
+        raise serializers.ValidationError({"error": "Foydalanuvchi yoki token topilmadi."})
 
-    def validate(self, attrs):
-        pk = attrs['pk']
-        token = attrs['token']
+    except token_service.ExpiredToken as e:
+        token_service.consume(e.token)
+        raise serializers.ValidationError(
+            {"error": "Token vaqti o'tib ketdi shu sababli token o'chirib tashaldi."}
+        )
 
-        try:
-            user = models.User.objects.get(id=pk)
-            token = models.Token.objects.get(token=token)
-
-        except models.User.DoesNotExist:
-            raise serializers.ValidationError({"error": "Foydalanuvchi bunday ID bilan topilmadi."})
 
-        except models.Token.DoesNotExist:
-            raise serializers.ValidationError({"error": "Token serverda topilmadi."})
+class RecoveryPasswordGetSerializer(serializers.Serializer):
+    pk = serializers.IntegerField()
+    token = serializers.CharField()
 
-        if token is None:
-            raise serializers.ValidationError({'error': "Token bo'lishi shart."})
-
-        if token.expires_at <= timezone.now():
-            raise serializers.ValidationError(
-                {"error": "Token vaqti o'tib ketdi shu sababli token o'chirib tashaldi."}
-            )
 
+    def validate(self, attrs):
+        user, _ = verify_recovery_token(attrs['pk'], attrs['token'])
         attrs['user'] = UserSerializer(user).data
         return attrs
 
@@ -244,24 +234,10 @@ class RecoveryPasswordPostSerializer(serializers.Serializer):
 
 
     def validate(self, attrs):
-        new_password = attrs['new_password']
-        id = self.context['pk']
-        token = self.context['token']
-        user = models.User.objects.get(id=id)
-        token = models.Token.objects.get(token=token)
-
-        if not new_password:
-            raise serializers.ValidationError({"error": "Parol kiritish shart."})
-
-        if not user:
-            raise serializers.ValidationError({"error": "Foydalanuvchi bu id bilan hali topilmadi."})
-
-        if not token:
-            raise serializers.ValidationError({"error": "Foydalanuvchi bu token bilan topilmadi"})
-
-        user.set_password(new_password)
+        user, token = verify_recovery_token(self.context['pk'], self.context['token'])
+        user.set_password(attrs.pop('new_password'))
         user.save()
-        token.delete()
+        token_service.consume(token)
         attrs['user'] = UserSerializer(user).data
         return attrs
 
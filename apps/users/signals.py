@@ -0,0 +1,31 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from . import authentication, blacklist
+from .models import Company, JobSeeker, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_authenticated_user(sender, instance, **kwargs):
+    # After the commit, so a concurrent request can't cache the row as it was before the write.
+    transaction.on_commit(partial(authentication.invalidate, instance.id))
+
+
+@receiver(post_save, sender=JobSeeker)
+@receiver(post_delete, sender=JobSeeker)
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_profile_owner(sender, instance, **kwargs):
+    transaction.on_commit(partial(authentication.invalidate, instance.user_id))
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_to_blacklist_cache(sender, instance, created, **kwargs):
+    # Covers simplejwt's own RefreshToken.blacklist() and the admin as well as apps.users.blacklist.RefreshToken.
+    if created:
+        blacklist.add(instance.token.jti, instance.token.expires_at.timestamp())
@@ -1,51 +1,60 @@
 from __future__ import absolute_import, unicode_literals
 
+import logging
+import time
+
 from celery import shared_task
 from django.conf import settings
-from django.core.mail import send_mail
 from django.utils import timezone
-from django.utils.translation import gettext_lazy as _
+
+logger = logging.getLogger(__name__)
 
 
 @shared_task
-def send_password_reset_email(email, full_link):
-    message = f"Yangi password kiritish uchun shu link bo'yicha o'ting: {full_link}."
-    try:
-        send_mail(
-            'Job Connect dan xabar!',
-            message,
-            settings.EMAIL_HOST_USER,
-            [email],
-            fail_silently=False
-        )
+def send_queued_emails():
+    from .outbox import drain
+    return drain()
+
 
-    except Exception as e:
-        return f"Email yuborishda xatolik yuzberdi {e}."
+# Tasks queued before the outbox, under the old names, are moved to the outbox. Drop once those have drained.
+@shared_task
+def send_password_reset_email(email, full_link):
+    from .outbox import queue_password_reset_email
+    queue_password_reset_email(email, full_link)
 
 
 @shared_task
 def send_verify_email_token(email, full_link):
-    message = _(
-        f"Sizning emailgiz Job Connect saytida ro'yxatdan o'tdi.\\Email sizga tegishligini tasdiqlash uchun ushbu link orqali saytga o'tsangiz bo'ladi: {full_link}")
+    from .outbox import queue_verify_email
+    queue_verify_email(email, full_link)
 
-    try:
-        send_mail(
-            "Job Connect saytidan xabar!",
-            message,
-            settings.EMAIL_HOST_USER,
-            [email],
-            fail_silently=False
-        )
 
-    except Exception as e:
-        return f"Email yuborishda xatolik yuzberdi {e}."
+@shared_task
+def flush_token_blacklist():
+    from .blacklist import flush_expired
+    return flush_expired()
 
 
 @shared_task
 def delete_tokens_expired():
+    """
+    Deletes expired tokens in chunks of TOKEN_CLEANUP_BATCH_SIZE, each in its own short statement,
+    and stops after TOKEN_CLEANUP_MAX_BATCHES so a backlog is spread over several runs.
+    """
     from .models import Token
-    try:
-        tokens = Token.objects.filter(expires_at__lte=timezone.now())
-        tokens.delete()
-    except Exception:
-        return "Token o'chirishda hato yuz berdi."
+
+    now = timezone.now()
+    batch_size = settings.TOKEN_CLEANUP_BATCH_SIZE
+    started = time.perf_counter()
+    deleted = 0
+    for _ in range(settings.TOKEN_CLEANUP_MAX_BATCHES):
+        ids = list(Token.objects.filter(expires_at__lte=now).order_by("expires_at").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        deleted += Token.objects.filter(id__in=ids).delete()[0]
+        if len(ids) < batch_size:
+            break
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"{deleted} expired tokens deleted in {elapsed:.2f}s.")
+    return {"deleted": deleted, "seconds": round(elapsed, 3)}
@@ -1,5 +1,25 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core import mail
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from redis import RedisError
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from apps.users import authentication, blacklist, outbox, tasks, token_service
+from apps.users.models import JobSeeker, OutgoingEmail, Token, User
 
 
 class RegisterTestCase(APITestCase):
@@ -25,6 +45,60 @@ class LoginTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
 
+class LoginQueryCountTestCase(APITestCase):
+    def setUp(self):
+        self.url = '/api/auth/login/'
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="seeker", email="seeker@gmail.com", password="132546587", is_active=True)
+        self.other = User.objects.create_user(username="seeker@example.com", email="other@gmail.com", password="132546587", is_active=True)
+
+    def login(self, login, password="132546587"):
+        with mock.patch("django.contrib.auth.base_user.check_password", wraps=check_password) as checked:
+            response = self.client.post(self.url, {"email": login, "password": password}, format='json')
+        return response, checked.call_count
+
+    def test_login_uses_one_lookup_and_one_hash(self):
+        for login in ("seeker", "seeker@gmail.com"):
+            with self.assertNumQueries(2):
+                response, hashes = self.login(login)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn("access", response.data['data'])
+            self.assertEqual(hashes, 1)
+
+        response, hashes = self.login("seeker", password="wrong-password")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(hashes, 1)
+
+    def test_username_match_wins_over_email_match(self):
+        User.objects.filter(username="seeker").update(email="seeker@example.com")
+        response, _ = self.login("seeker@example.com")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['data']['access'])['user_id'], self.other.id)
+
+
+@override_settings(PASSWORD_HASHERS=list(settings.PASSWORD_HASHER_CLASSES.values()))
+class PasswordRehashTestCase(APITestCase):
+    def setUp(self):
+        self.url = '/api/auth/login/'
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="seeker", email="seeker@gmail.com", password="132546587", is_active=True)
+
+    def login(self):
+        response = self.client.post(self.url, {"email": "seeker", "password": "132546587"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        return self.user.password
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_old_hashes_are_upgraded_on_login(self):
+        User.objects.filter(id=self.user.id).update(password=make_password("132546587", hasher="pbkdf2_sha256"))
+        self.assertTrue(self.login().startswith("scrypt$"))
+
+    @override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 10)
+    def test_cost_change_rehashes_on_login(self):
+        self.assertEqual(self.login().split("$")[1], str(2 ** 10))
+
+
 class RefreshTokenTestCase(APITestCase):
     def setUp(self):
         self.url = '/api/auth/refresh/'
@@ -203,3 +277,265 @@ class UsersStatsListTestCase(APITestCase):
     def test_list_get(self):
         response = self.client.get(self.url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_OUTBOX_BATCH_SIZE=2,
+    EMAIL_OUTBOX_RATE_LIMIT=0,
+)
+class EmailOutboxTestCase(APITestCase):
+    def setUp(self):
+        with mock.patch("apps.users.tasks.send_queued_emails.delay"):
+            for i in range(3):
+                outbox.queue_password_reset_email(f"user{i}@gmail.com", f"http://testserver/recovery/{i}/")
+
+    def test_emails_are_sent_in_batches_over_one_connection(self):
+        with mock.patch("apps.users.outbox.get_connection", wraps=outbox.get_connection) as get_connection:
+            self.assertEqual(outbox.drain(), {"sent": 3, "failed": 0})
+        get_connection.assert_called_once()
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ["user0@gmail.com", "user1@gmail.com", "user2@gmail.com"])
+        self.assertFalse(OutgoingEmail.objects.exclude(status=OutgoingEmail.StatusChoice.SENT).exists())
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_emails_are_retried_with_backoff(self):
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("down")):
+            self.assertEqual(outbox.drain(), {"sent": 0, "failed": 3})
+        email = OutgoingEmail.objects.first()
+        self.assertEqual((email.status, email.attempts, email.last_error), (OutgoingEmail.StatusChoice.PENDING, 1, "down"))
+        self.assertEqual(outbox.drain(), {"sent": 0, "failed": 0})
+
+        OutgoingEmail.objects.update(next_attempt_at=email.created_at)
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("down")):
+            outbox.drain()
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.StatusChoice.FAILED).count(), 3)
+
+    @override_settings(EMAIL_OUTBOX_BATCH_SIZE=10, EMAIL_OUTBOX_RATE_LIMIT=0)
+    def test_claimed_emails_are_leased_while_they_are_sent(self):
+        concurrent = []
+
+        def send_messages(messages):
+            concurrent.append(outbox.claim(10, timezone.now()))
+            return len(messages)
+
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=send_messages):
+            self.assertEqual(outbox.drain(), {"sent": 3, "failed": 0})
+        self.assertEqual(concurrent, [[], [], []])
+
+
+    @override_settings(EMAIL_OUTBOX_RATE_LIMIT=0)
+    def test_lease_of_an_abandoned_claim_expires(self):
+        self.assertEqual(len(outbox.claim(10, timezone.now())), 3)
+        self.assertEqual(outbox.claim(10, timezone.now()), [])
+        self.assertEqual(len(outbox.claim(10, timezone.now() + timedelta(seconds=301))), 3)
+
+    def test_tasks_queued_under_the_old_names_use_the_outbox(self):
+        with mock.patch("apps.users.tasks.send_queued_emails.delay"):
+            tasks.send_verify_email_token("new@gmail.com", "http://testserver/verify/")
+            tasks.send_password_reset_email("new@gmail.com", "http://testserver/recovery/")
+        self.assertEqual(OutgoingEmail.objects.filter(to="new@gmail.com").count(), 2)
+
+    @override_settings(EMAIL_OUTBOX_RATE_LIMIT=2)
+    def test_sends_are_rate_limited(self):
+        self.addCleanup(outbox.redis_client.delete, outbox.RATE_KEY.format(provider=outbox.provider(), window=0))
+        with mock.patch("time.time", return_value=0):
+            self.assertEqual(outbox.drain(), {"sent": 2, "failed": 0})
+            self.assertEqual(outbox.drain(), {"sent": 0, "failed": 0})
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.StatusChoice.PENDING).count(), 1)
+
+
+class TokenServiceTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="seeker", email="seeker@gmail.com", password="132546587")
+
+    def test_token_is_looked_up_with_its_user_in_one_query(self):
+        token = token_service.issue(self.user, token_service.VERIFY_EMAIL)
+        with self.assertNumQueries(1):
+            user, _ = token_service.verify(self.user.id, token, token_service.VERIFY_EMAIL)
+        self.assertEqual(user, self.user)
+        with self.assertRaises(token_service.InvalidToken):
+            token_service.verify(self.user.id + 1, token, token_service.VERIFY_EMAIL)
+
+        response = self.client.get(f"/api/user/verify-email/{self.user.id}/{token}/", format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verify_email)
+        self.assertFalse(Token.objects.exists())
+
+    def test_token_is_valid_only_for_its_purpose(self):
+        token = token_service.issue(self.user, token_service.VERIFY_EMAIL)
+        with self.assertRaises(token_service.InvalidToken):
+            token_service.verify(self.user.id, token, token_service.RECOVER_PASSWORD)
+
+        response = self.client.post(f"/api/user/recovery-password/{self.user.id}/{token}/", {"new_password": "new-password"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.check_password("new-password"))
+        self.assertTrue(Token.objects.filter(token=token).exists())
+
+    @override_settings(VERIFICATION_TOKEN_SIGNED=True)
+    def test_signed_token_is_used_once(self):
+        token = token_service.issue(self.user, token_service.RECOVER_PASSWORD)
+        self.assertFalse(Token.objects.exists())
+        with self.assertRaises(token_service.InvalidToken):
+            token_service.verify(self.user.id, token, token_service.VERIFY_EMAIL)
+
+        url = f"/api/user/recovery-password/{self.user.id}/{token}/"
+        response = self.client.post(url, {"new_password": "new-password"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("new-password"))
+
+        response = self.client.post(url, {"new_password": "other-password"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(VERIFICATION_TOKEN_SIGNED=True, VERIFICATION_TOKEN_LIFETIME=timedelta(seconds=-1))
+    def test_signed_token_expires(self):
+        token = token_service.issue(self.user, token_service.VERIFY_EMAIL)
+        with self.assertRaises(token_service.ExpiredToken):
+            token_service.verify(self.user.id, token, token_service.VERIFY_EMAIL)
+
+
+class TokenCleanupTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="seeker", email="seeker@gmail.com", password="132546587")
+
+    def test_expiry_is_computed_per_token(self):
+        with mock.patch("django.utils.timezone.now", return_value=timezone.now() + timedelta(hours=1)):
+            token = Token.objects.create(user=self.user)
+        self.assertGreater(token.expires_at, timezone.now() + timedelta(hours=1))
+
+    @override_settings(TOKEN_CLEANUP_BATCH_SIZE=2)
+    def test_expired_tokens_are_deleted_in_batches(self):
+        Token.objects.bulk_create([Token(user=self.user, token=str(i), expires_at=timezone.now() - timedelta(minutes=i)) for i in range(1, 4)])
+        fresh = Token.objects.create(user=self.user)
+
+        with self.assertNumQueries(4):
+            result = tasks.delete_tokens_expired()
+        self.assertEqual(result["deleted"], 3)
+        self.assertEqual(list(Token.objects.all()), [fresh])
+
+
+class CachedAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="seeker", email="seeker@gmail.com", password="132546587", is_active=True)
+        self.job_seeker = JobSeeker.objects.create(
+            user=self.user, first_name="Test", last_name="Test", date_of_birth="2000-01-01", phone_number="+998901234567",
+            location="test", bio="test", experience_years=1, education_level="Bachelors"
+        )
+        self.addCleanup(authentication.invalidate, self.user.id)
+        self.token = AccessToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def test_user_and_roles_are_cached(self):
+        with self.assertNumQueries(1):
+            user = authentication.CachedJWTAuthentication().get_user(self.token)
+        with self.assertNumQueries(0):
+            user = authentication.CachedJWTAuthentication().get_user(self.token)
+            self.assertEqual((user.id, user.email, user.profile_id, user.company_id), (self.user.id, self.user.email, self.job_seeker.id, None))
+            self.assertEqual(user.date_joined, self.user.date_joined)
+        self.assertTrue(user.check_password("132546587"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job_seeker.delete()
+        user = authentication.CachedJWTAuthentication().get_user(self.token)
+        self.assertIsNone(user.profile_id)
+
+    def test_cache_is_invalidated_after_the_commit(self):
+        authentication.CachedJWTAuthentication().get_user(self.token)
+        key = authentication.USER_KEY.format(user_id=self.user.id)
+        cached = authentication.redis_client.get(key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+            # A concurrent request still reads the row as it was before the commit and caches it again.
+            authentication.redis_client.set(key, cached)
+        with self.assertRaises(AuthenticationFailed):
+            authentication.CachedJWTAuthentication().get_user(self.token)
+
+    def test_profile_request_does_not_load_the_user(self):
+        self.client.get("/api/user/me/", format='json')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/user/me/", format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in queries if 'FROM "users_user"' in query["sql"]])
+        self.assertEqual(response.data['data']['user']['email'], self.user.email)
+
+
+class TokenBlacklistTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="seeker", email="seeker@gmail.com", password="132546587", is_active=True)
+        blacklist.redis_client.delete(blacklist.BLACKLIST_KEY)
+        self.addCleanup(blacklist.redis_client.delete, blacklist.BLACKLIST_KEY, blacklist.GENERATION_KEY)
+
+    def test_synced_blacklist_is_checked_without_queries(self):
+        revoked, active = blacklist.RefreshToken.for_user(self.user), blacklist.RefreshToken.for_user(self.user)
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=revoked["jti"]))
+        blacklist.redis_client.delete(blacklist.BLACKLIST_KEY)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(blacklist.is_blacklisted(revoked["jti"]))
+        blacklist.sync(batch_size=1)
+        with self.assertNumQueries(0):
+            self.assertTrue(blacklist.is_blacklisted(revoked["jti"]))
+            self.assertFalse(blacklist.is_blacklisted(active["jti"]))
+        self.assertEqual(blacklist.size(), 1)
+
+    def test_unmark_during_sync_leaves_the_set_unmarked(self):
+        now = timezone.now()
+
+        def unmark_while_loading():
+            blacklist.unmark()
+            return now
+
+        with mock.patch.object(blacklist.timezone, "now", side_effect=unmark_while_loading):
+            self.assertFalse(blacklist.sync(batch_size=100))
+        self.assertIsNone(blacklist.redis_client.zscore(blacklist.BLACKLIST_KEY, blacklist.SYNCED_MEMBER))
+
+        self.assertTrue(blacklist.sync(batch_size=100))
+        self.assertIsNotNone(blacklist.redis_client.zscore(blacklist.BLACKLIST_KEY, blacklist.SYNCED_MEMBER))
+
+    def test_rotated_token_is_blacklisted_in_redis(self):
+        blacklist.sync(batch_size=100)
+        refresh = blacklist.RefreshToken.for_user(self.user)
+
+        response = self.client.post('/api/auth/refresh/', {"refresh": str(refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(blacklist.redis_client.zscore(blacklist.BLACKLIST_KEY, refresh["jti"]))
+
+        response = self.client.post('/api/auth/refresh/', {"refresh": str(refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stock_blacklisting_is_added_to_redis(self):
+        blacklist.sync(batch_size=100)
+        refresh = RefreshToken.for_user(self.user)
+        refresh.blacklist()
+        with self.assertNumQueries(0):
+            self.assertTrue(blacklist.is_blacklisted(refresh["jti"]))
+
+    def test_failed_add_falls_back_to_the_db(self):
+        blacklist.sync(batch_size=100)
+        refresh = blacklist.RefreshToken.for_user(self.user)
+        with mock.patch.object(blacklist.redis_client, "zadd", side_effect=RedisError("down")):
+            refresh.blacklist()
+        self.assertIsNone(blacklist.redis_client.zscore(blacklist.BLACKLIST_KEY, blacklist.SYNCED_MEMBER))
+        with self.assertNumQueries(1):
+            self.assertTrue(blacklist.is_blacklisted(refresh["jti"]))
+
+    @override_settings(TOKEN_BLACKLIST_FLUSH_BATCH_SIZE=2)
+    def test_expired_tokens_are_flushed_in_batches(self):
+        expired = [blacklist.RefreshToken.for_user(self.user) for _ in range(3)]
+        for token in expired:
+            token.blacklist()
+        active = blacklist.RefreshToken.for_user(self.user)
+        OutstandingToken.objects.exclude(jti=active["jti"]).update(expires_at=timezone.now() - timedelta(minutes=1))
+        blacklist.redis_client.zadd(blacklist.BLACKLIST_KEY, {token["jti"]: 0 for token in expired})
+
+        result = tasks.flush_token_blacklist()
+        self.assertEqual((result["outstanding_deleted"], result["outstanding"], result["blacklisted"]), (3, 1, 0))
+        self.assertFalse(BlacklistedToken.objects.exists())
+        with self.assertNumQueries(0):
+            self.assertFalse(blacklist.is_blacklisted(active["jti"]))
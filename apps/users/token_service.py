@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import Token, User
+
+VERIFY_EMAIL = Token.PurposeChoice.VERIFY_EMAIL
+RECOVER_PASSWORD = Token.PurposeChoice.RECOVER_PASSWORD
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class ExpiredToken(Exception):
+    def __init__(self, user, token=None):
+        super().__init__(user, token)
+        self.user = user
+        self.token = token
+
+
+def fingerprint(user):
+    """
+    Changes as soon as the user verifies the email or changes the password, so a signed token can be used only once.
+    """
+    return salted_hmac("apps.users.token_service", f"{user.id}:{user.password}:{user.is_verify_email}").hexdigest()[:20]
+
+
+def signer(purpose):
+    return signing.TimestampSigner(salt=f"apps.users.token_service.{purpose}")
+
+
+def issue(user, purpose):
+    """
+    Returns a new token for the user. A signed token needs no Token row, it is checked by its HMAC and timestamp.
+    """
+    if settings.VERIFICATION_TOKEN_SIGNED:
+        return signer(purpose).sign(fingerprint(user))
+    return Token.objects.create(user=user, purpose=purpose).token
+
+
+def verify(user_id, token, purpose):
+    """
+    Returns (user, token row) for a valid token, the row is None for signed tokens.
+    Raises InvalidToken when the token does not belong to the user or was issued for another purpose and
+    ExpiredToken when it is too old.
+    """
+    if settings.VERIFICATION_TOKEN_SIGNED:
+        return verify_signed(user_id, token, purpose), None
+
+    try:
+        token = Token.objects.select_related("user").get(token=token, user_id=user_id, purpose=purpose)
+    except Token.DoesNotExist:
+        raise InvalidToken()
+    if token.expires_at <= timezone.now():
+        raise ExpiredToken(token.user, token)
+    return token.user, token
+
+
+def verify_signed(user_id, token, purpose):
+    try:
+        user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        raise InvalidToken()
+    try:
+        value = signer(purpose).unsign(token)
+    except signing.BadSignature:
+        raise InvalidToken()
+    if not constant_time_compare(value, fingerprint(user)):
+        raise InvalidToken()
+    try:
+        signer(purpose).unsign(token, max_age=settings.VERIFICATION_TOKEN_LIFETIME)
+    except signing.SignatureExpired:
+        raise ExpiredToken(user)
+    return user
+
+
+def consume(token):
+    if token is not None:
+        token.delete()
@@ -18,10 +18,10 @@ from rest_framework.generics import (
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from . import models, serializers, tasks, versioning
+from . import models, outbox, serializers, token_service, versioning
+from .authentication import CachedJWTAuthentication
 from .custom_response_decorator import custom_response
 from .paginations import CompanyPageNumberPagination
 
@@ -39,12 +39,12 @@ class RegisterAPIView(CreateAPIView):
             serializer = self.get_serializer(data=request.data)
             if serializer.is_valid():
                 user = serializer.save()
-                token = models.Token.objects.create(user=user)
-                verification_link = reverse("verify-email", kwargs={"pk": user.id, "token": token.token})
+                token = token_service.issue(user, token_service.VERIFY_EMAIL)
+                verification_link = reverse("verify-email", kwargs={"pk": user.id, "token": token})
                 current_site = get_current_site(request).domain
                 full_link = f"http://{current_site}{verification_link}"
 
-                tasks.send_verify_email_token.delay(user.email, full_link)
+                outbox.queue_verify_email(user.email, full_link)
 
                 return Response(
                     {
@@ -77,11 +77,11 @@ class ForgotPasswordAPIView(APIView):
         if version == '1.0':
             serializer = serializers.ForgotPasswordSerializer(data=request.data)
             if serializer.is_valid(raise_exception=True):
-                token = models.Token.objects.create(user=serializer.validated_data.get("user"))
-                verification_link = reverse('recovery_password', kwargs={'pk': serializer.validated_data.get('user').id, 'token': token.token})
+                token = token_service.issue(serializer.validated_data.get("user"), token_service.RECOVER_PASSWORD)
+                verification_link = reverse('recovery_password', kwargs={'pk': serializer.validated_data.get('user').id, 'token': token})
                 current_site = get_current_site(request).domain
                 full_link = f"http://{current_site}{verification_link}"
-                tasks.send_password_reset_email.delay(serializer.validated_data.get('email'), full_link)
+                outbox.queue_password_reset_email(serializer.validated_data.get('email'), full_link)
                 serializer.validated_data.pop("user")
             return Response(serializer.validated_data)
 
@@ -119,6 +119,7 @@ class LoginAPIView(TokenObtainPairView):
 
 @custom_response("refresh")
 class TokenRefreshAPIView(TokenRefreshView):
+    serializer_class = serializers.CustomTokenRefreshSerializer
     versioning_class = versioning.CustomHeaderVersioning
 
     def post(self, request, *args, **kwargs):
@@ -130,7 +131,7 @@ class TokenRefreshAPIView(TokenRefreshView):
 @custom_response("logout")
 class LogoutAPIView(APIView):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication,]
+    authentication_classes = [CachedJWTAuthentication,]
     versioning_class = versioning.CustomHeaderVersioning
 
     def post(self, request, *args, **kwargs):
@@ -170,12 +171,12 @@ class UserProfileRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView, User
     def get_object(self):
         version = self.request.version
         if version == '1.0':
-            try:
-                return models.JobSeeker.objects.get(user=self.request.user)
-
-            except models.JobSeeker.DoesNotExist:
+            job_seeker = self.request.user.get_profile()
+            if job_seeker is None:
                 return Response({"status": False, "message": "User profile topilmadi."}, status=status.HTTP_404_NOT_FOUND)
 
+            return job_seeker
+
 
     def retrieve(self, request, *args, **kwargs):
         version = self.request.version
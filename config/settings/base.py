@@ -41,6 +41,7 @@ BASE_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 LOCAL_APPS = [
@@ -135,6 +136,26 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Hasher for new passwords: scrypt, argon2 (needs the argon2-cffi package) or pbkdf2.
+# Passwords hashed by another hasher or with other costs are rehashed on the next successful login.
+PASSWORD_HASHER = env('PASSWORD_HASHER', default='scrypt')
+PASSWORD_HASHER_CLASSES = {
+    'scrypt': 'apps.users.hashers.ScryptPasswordHasher',
+    'argon2': 'apps.users.hashers.Argon2PasswordHasher',
+    'pbkdf2': 'apps.users.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CLASSES[PASSWORD_HASHER],
+    *[path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER],
+]
+# The defaults follow the OWASP recommendations, the memory used is 128 * work factor * 8 bytes.
+PASSWORD_SCRYPT_WORK_FACTOR = 2 ** 14
+PASSWORD_SCRYPT_PARALLELISM = 5
+PASSWORD_ARGON2_TIME_COST = 2
+PASSWORD_ARGON2_MEMORY_COST = 102400
+PASSWORD_ARGON2_PARALLELISM = 8
+PASSWORD_PBKDF2_ITERATIONS = 870000
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -163,7 +184,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.UserRateThrottle',
@@ -185,11 +206,41 @@ SIMPLE_JWT = {
     'BLACKLIST_ENABLED': True,
 }
 
+# Seconds an authenticated user, with their profile and company ids, is cached between requests.
+AUTH_USER_CACHE_TTL = 60
+
+# Signed verification tokens are checked by HMAC and timestamp and need no Token rows.
+VERIFICATION_TOKEN_SIGNED = False
+VERIFICATION_TOKEN_LIFETIME = timedelta(seconds=200)
+TOKEN_CLEANUP_BATCH_SIZE = 1000
+TOKEN_CLEANUP_MAX_BATCHES = 100
+# Expired outstanding refresh tokens, with their blacklist rows, are deleted in chunks by the hourly flush.
+TOKEN_BLACKLIST_FLUSH_BATCH_SIZE = 5000
+TOKEN_BLACKLIST_FLUSH_MAX_BATCHES = 100
+
 
 REDIS_HOST = '127.0.0.1'
 REDIS_PORT = 6379
 REDIS_DB = 0
 
+NOTIFICATION_BULK_BATCH_SIZE = 1000
+NOTIFICATION_FANOUT_CHUNK_SIZE = 10000
+NOTIFICATION_CHANNEL_LAYER = 'apps.notifications.push.RedisChannelLayer'
+NOTIFICATION_STREAM_HEARTBEAT = 15
+NOTIFICATION_STREAM_REPLAY_BATCH_SIZE = 50
+# Days a notification is kept, per notification type. None keeps the type forever.
+NOTIFICATION_RETENTION_DAYS = {
+    'Application status change': 180,
+    'Job Posting': 30,
+    'Message': 365,
+    'System': 90,
+}
+NOTIFICATION_ARCHIVE = False
+NOTIFICATION_PURGE_BATCH_SIZE = 5000
+NOTIFICATION_PURGE_MAX_BATCHES = 200
+# Seconds status changes of one application are collected before its job seeker is notified.
+APPLICATION_STATUS_NOTIFICATION_DELAY = 60
+
 
 CELERY_BEAT_SCHEDULE = {
     'update-post-status-every-minute': {
@@ -200,6 +251,26 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.users.tasks.delete_tokens_expired',
         'schedule': crontab(minute='*/15'),
     },
+    'flush-post-views-every-minute': {
+        'task': 'apps.posts.tasks.flush_post_views',
+        'schedule': crontab(minute='*/1'),
+    },
+    'refresh-stats-snapshots-every-five-minutes': {
+        'task': 'apps.posts.tasks.refresh_stats_snapshots',
+        'schedule': crontab(minute='*/5'),
+    },
+    'send-queued-emails-every-minute': {
+        'task': 'apps.users.tasks.send_queued_emails',
+        'schedule': crontab(minute='*/1'),
+    },
+    'purge-expired-notifications-every-night': {
+        'task': 'apps.notifications.tasks.purge_expired_notifications',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'flush-token-blacklist-every-hour': {
+        'task': 'apps.users.tasks.flush_token_blacklist',
+        'schedule': crontab(minute=30),
+    },
 }
 
 
@@ -208,6 +279,18 @@ EMAIL_HOST_USER = env('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD')
 EMAIL_PORT = env('EMAIL_PORT')
 EMAIL_USE_TLS = env('EMAIL_USE_TLS')
+# Set to django.core.mail.backends.filebased.EmailBackend or console.EmailBackend to load-test the outbox offline.
+EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = env('EMAIL_FILE_PATH', default=str(BASE_DIR / 'sent_emails'))
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_MAX_BATCHES = 20
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# Seconds before the first retry, doubled on every following attempt.
+EMAIL_OUTBOX_RETRY_DELAY = 60
+# Emails per minute accepted by the provider, 0 disables the limit.
+EMAIL_OUTBOX_RATE_LIMIT = 100
+# Seconds a drain holds the emails it claimed before another drain may send them again.
+EMAIL_OUTBOX_LEASE = 300
 
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
@@ -0,0 +1,4 @@
+from .development import * #noqa
+
+# Tests create many users, MD5 keeps each hash cheap. Tests of the real hashers override this.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
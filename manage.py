@@ -6,7 +6,7 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.test' if sys.argv[1:2] == ['test'] else 'config.settings.development')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc: